@@ -0,0 +1,151 @@
+# ========== Imports ==========
+import time
+import random
+import asyncio
+
+from bisect import bisect_left
+from collections import deque
+from typing import Optional
+from aiohttp import web
+
+from benchmarks.fixtures import PLATFORM, load_recorded, match_body
+
+
+# ========== Class FakeRiotServer ==========
+class FakeRiotServer:
+    """
+    Local stand-in for the account-v1, match-v5, league-v4 and spectator-v5 endpoints used by `riot/api.py`.
+
+    Every player has a match list that grows by one game with probability `new_match_rate` each time
+    its match IDs are asked, so a polling sweep sees a realistic share of new matches.
+    Match bodies come from the recorded fixtures when there is one, synthetic ones otherwise.
+    Ranked entries follow the games played (+-20 LP each), and nobody is ever in a live game.
+    Responses carry the usual rate-limit headers; going over `app_limits` answers 429 with
+    `Retry-After`, and `error_rate` injects extra 429s at random.
+
+    *Functions*:
+        `start()`: starts listening on 127.0.0.1 and returns the base URL.
+        `stop()`: stops the server.
+    """
+
+    def __init__(
+            self,
+            latency: float = 0.02,
+            jitter: float = 0.01,
+            error_rate: float = 0.0,
+            new_match_rate: float = 0.2,
+            app_limits: str = "500:1,30000:120",
+            method_limits: str = "2000:10"):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.new_match_rate = new_match_rate
+        self.app_limits = app_limits
+        self.method_limits = method_limits
+
+        self.requests = 0
+        self.throttled = 0
+        self._limits = [tuple(map(int, part.split(":"))) for part in app_limits.split(",")]
+        self._sent: deque[float] = deque()
+        self._players: dict[str, int] = {}     # puuid -> player number
+        self._games: dict[str, int] = {}       # puuid -> games played so far
+        self._recorded = load_recorded()
+        self._bodies: dict[str, bytes] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    # ===== Lifetime =====
+    async def start(self, port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get("/riot/account/v1/accounts/by-riot-id/{name}/{tag}", self._account)
+        app.router.add_get("/lol/match/v5/matches/by-puuid/{puuid}/ids", self._match_ids)
+        app.router.add_get("/lol/match/v5/matches/{match_id}", self._match)
+        app.router.add_get("/lol/league/v4/entries/by-puuid/{puuid}", self._ranked_entries)
+        app.router.add_get("/lol/spectator/v5/active-games/by-summoner/{puuid}", self._active_game)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        return f"http://127.0.0.1:{bound_port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # ===== Helpers =====
+    def _counts(self, now: float) -> list[tuple[int, int]]:
+        """(requests sent, seconds) for every window of `app_limits`."""
+        longest = max(seconds for _, seconds in self._limits)
+        while self._sent and now - self._sent[0] > longest:
+            self._sent.popleft()
+        # `_sent` is sorted, so each window count is a binary search away
+        return [(len(self._sent) - bisect_left(self._sent, now - seconds), seconds) for _, seconds in self._limits]
+
+    def _headers(self, counts: list[tuple[int, int]]) -> dict[str, str]:
+        return {
+            "X-App-Rate-Limit": self.app_limits,
+            "X-App-Rate-Limit-Count": ",".join(f"{count}:{seconds}" for count, seconds in counts),
+            "X-Method-Rate-Limit": self.method_limits,
+            "X-Method-Rate-Limit-Count": f"0:{self.method_limits.split(':')[1]}",
+        }
+
+    async def _respond(self, body: bytes, status: int = 200) -> web.Response:
+        await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        self.requests += 1
+
+        now = time.monotonic()
+        counts = self._counts(now)
+        over_limit = any(count >= limit for (count, _), (limit, _) in zip(counts, self._limits))
+        if over_limit or random.random() < self.error_rate:
+            self.throttled += 1
+            headers = self._headers(counts)
+            headers["Retry-After"] = "1"
+            headers["X-Rate-Limit-Type"] = "application" if over_limit else "service"
+            return web.Response(status=429, headers=headers)
+
+        self._sent.append(now)
+        counts = [(count + 1, seconds) for count, seconds in counts]
+        return web.Response(status=status, body=body, content_type="application/json", headers=self._headers(counts))
+
+    # ===== Endpoints =====
+    async def _account(self, request: web.Request) -> web.Response:
+        name, tag = request.match_info["name"], request.match_info["tag"]
+        body = f'{{"puuid": "bench-{name}-{tag}", "gameName": "{name}", "tagLine": "{tag}"}}'
+        return await self._respond(body.encode())
+
+    async def _match_ids(self, request: web.Request) -> web.Response:
+        puuid = request.match_info["puuid"]
+        count = int(request.query.get("count", "20"))
+        start = int(request.query.get("start", "0"))
+
+        games = self._games.setdefault(puuid, 20)
+        if random.random() < self.new_match_rate:
+            games = self._games[puuid] = games + 1
+
+        # Newest first; (player number, game) makes every match ID unique
+        player = self._players.setdefault(puuid, len(self._players) + 1)
+        ids = [f"{PLATFORM}_{player * 10**4 + game}" for game in range(games - start, max(games - start - count, 0), -1)]
+        return await self._respond(("[" + ",".join(f'"{i}"' for i in ids) + "]").encode())
+
+    async def _match(self, request: web.Request) -> web.Response:
+        match_id = request.match_info["match_id"]
+        body = self._recorded.get(match_id) or self._bodies.get(match_id)
+        if body is None:
+            body = self._bodies[match_id] = match_body(match_id)
+        return await self._respond(body)
+
+    async def _ranked_entries(self, request: web.Request) -> web.Response:
+        puuid = request.match_info["puuid"]
+        games = self._games.get(puuid, 20)
+        league_points = 50 + (games * 20) % 100
+        body = (
+            f'[{{"leagueId": "bench", "queueType": "RANKED_SOLO_5x5", "tier": "GOLD", "rank": "II", '
+            f'"puuid": "{puuid}", "leaguePoints": {league_points}, "wins": {games // 2}, "losses": {games - games // 2}, '
+            f'"veteran": false, "inactive": false, "freshBlood": false, "hotStreak": false}}]'
+        )
+        return await self._respond(body.encode())
+
+    async def _active_game(self, request: web.Request) -> web.Response:
+        return await self._respond(b'{"status": {"message": "Data not found", "status_code": 404}}', status=404)
@@ -0,0 +1,153 @@
+# ========== Imports ==========
+import os
+import json
+import random
+
+from typing import Any, Optional, get_args, get_origin, get_type_hints, is_typeddict
+
+from riot.riot_types import ChallengesData, MissionData, ParticipantData
+
+
+# ========== Constants ==========
+# Real Match-V5 bodies dropped here (<match_id>.json) are served instead of synthetic ones
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+PLATFORM = "EUW1"
+QUEUE_ID = 420
+GAME_VERSION = "14.20.628.8763"
+
+CHAMPIONS = ("Ahri", "Garen", "Jinx", "LeeSin", "Thresh", "Lux", "Darius", "Ezreal", "Leona", "Yasuo")
+POSITIONS = ("TOP", "JUNGLE", "MIDDLE", "BOTTOM", "UTILITY")
+
+
+# ========== Functions ==========
+def _fill(typed_dict: Any, rng: random.Random) -> dict:
+    """Plausible random values for every field of a TypedDict, so fixtures have the size and shape of real ones."""
+    data = {}
+    for key, hint in get_type_hints(typed_dict).items():
+        data[key] = _value(hint, rng)
+    return data
+
+
+def _value(hint: Any, rng: random.Random) -> Any:
+    if is_typeddict(hint):
+        return _fill(hint, rng)
+    if get_origin(hint) is list:
+        (item,) = get_args(hint)
+        return [_value(item, rng) for _ in range(2)]
+    if hint is bool:
+        return rng.random() < 0.5
+    if hint is int:
+        return rng.randint(0, 20000)
+    if hint is float:
+        return round(rng.uniform(0, 100), 4)
+    if hint is str:
+        return "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=8))
+    return None
+
+
+def make_participant(puuid: str, participant_id: int, rng: random.Random) -> dict:
+    team_id = 100 if participant_id <= 5 else 200
+    participant = _fill(ParticipantData, rng)
+    participant["challenges"] = _fill(ChallengesData, rng)
+    participant["missions"] = _fill(MissionData, rng)
+    participant.update(
+        puuid=puuid,
+        participantId=participant_id,
+        teamId=team_id,
+        riotIdGameName=f"Player{participant_id}",
+        riotIdTagline="EUW",
+        championName=rng.choice(CHAMPIONS),
+        teamPosition=POSITIONS[(participant_id - 1) % 5],
+        kills=rng.randint(0, 15),
+        deaths=rng.randint(0, 12),
+        assists=rng.randint(0, 25),
+        perks={
+            "statPerks": {"defense": 5001, "flex": 5008, "offense": 5005},
+            "styles": [
+                {"description": "primaryStyle", "style": 8100,
+                 "selections": [{"perk": p, "var1": 0, "var2": 0, "var3": 0} for p in (8112, 8139, 8138, 8135)]},
+                {"description": "subStyle", "style": 8200,
+                 "selections": [{"perk": p, "var1": 0, "var2": 0, "var3": 0} for p in (8226, 8237)]},
+            ],
+        },
+    )
+    for slot in range(7):
+        participant[f"item{slot}"] = rng.choice((0, 1055, 3031, 3006, 3072, 3094, 3363))
+    return participant
+
+
+def make_match(match_id: str, puuids: Optional[list[str]] = None, seed: Optional[int] = None) -> dict:
+    """Builds a synthetic Match-V5 body with 10 fully populated participants.
+
+    Args:
+        match_id (str): e.g. "EUW1_7000000001", the game ID is taken from the part after "_".
+        puuids (list[str], optional): The PUUIDs of the participants (padded with random ones up to 10).
+        seed (int, optional): Seed of the random values, the match ID's hash by default.
+
+    Returns:
+        dict: The match, shaped like `MatchData`.
+    """
+    rng = random.Random(seed if seed is not None else match_id)
+    puuids = list(puuids or [])[:10]
+    puuids += [f"bench-puuid-{rng.getrandbits(64):016x}" for _ in range(10 - len(puuids))]
+
+    duration = rng.randint(900, 2400)
+    end = 1_700_000_000_000 + rng.randint(0, 10**9)
+    blue_wins = rng.random() < 0.5
+
+    participants = [make_participant(puuid, i + 1, rng) for i, puuid in enumerate(puuids)]
+    for participant in participants:
+        participant["win"] = (participant["teamId"] == 100) == blue_wins
+
+    teams = []
+    for team_id in (100, 200):
+        objectives = {
+            name: {"first": rng.random() < 0.5, "kills": rng.randint(0, 10)}
+            for name in ("baron", "champion", "dragon", "horde", "inhibitor", "riftHerald", "tower")
+        }
+        teams.append({
+            "teamId": team_id,
+            "win": (team_id == 100) == blue_wins,
+            "bans": [{"championId": rng.randint(1, 900), "pickTurn": turn} for turn in range(1, 6)],
+            "objectives": objectives,
+        })
+
+    return {
+        "metadata": {"matchId": match_id, "dataVersion": "2", "participants": puuids},
+        "info": {
+            "gameId": int(match_id.rsplit("_", 1)[-1]) if match_id.rsplit("_", 1)[-1].isdigit() else 0,
+            "gameCreation": end - duration * 1000 - 60_000,
+            "gameDuration": duration,
+            "gameStartTimestamp": end - duration * 1000,
+            "gameEndTimestamp": end,
+            "gameMode": "CLASSIC",
+            "gameType": "MATCHED_GAME",
+            "gameName": "teambuilder-match",
+            "gameVersion": GAME_VERSION,
+            "mapId": 11,
+            "platformId": PLATFORM,
+            "queueId": QUEUE_ID,
+            "tournamentCode": "",
+            "endOfGameResult": "GameComplete",
+            "teams": teams,
+            "participants": participants,
+        },
+    }
+
+
+def load_recorded(directory: str = FIXTURES_DIR) -> dict[str, bytes]:
+    """Returns {match ID: raw body} of the recorded matches in `directory` (empty if there are none)."""
+    if not os.path.isdir(directory):
+        return {}
+
+    recorded = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), "rb") as f:
+                recorded[name[:-5]] = f.read()
+    return recorded
+
+
+def match_body(match_id: str, puuids: Optional[list[str]] = None) -> bytes:
+    return json.dumps(make_match(match_id, puuids)).encode()
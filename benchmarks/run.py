@@ -0,0 +1,302 @@
+"""
+Offline benchmarks for the bot, against a local fake of the Riot API.
+
+Usage (from the repository root):
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.run --only storage,extractors --users 100,1000
+
+Results are written as JSON (with the commit they were measured on) so runs can be diffed across commits.
+"""
+
+# ========== Imports ==========
+import os
+import gc
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+import platform
+import statistics
+import subprocess
+import tempfile
+
+from types import SimpleNamespace
+from typing import Any, Callable
+
+# The benchmarks never talk to Riot, but `riot/api.py` refuses to send a request without a token
+os.environ.setdefault("RIOT_TOKEN", "benchmark")
+
+from benchmarks.fake_riot import FakeRiotServer
+from benchmarks.fixtures import load_recorded, match_body
+
+
+# ========== Helpers ==========
+def _timings(samples: list[float]) -> dict[str, float]:
+    """Summary of durations in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "min_ms": ordered[0] * 1000,
+    }
+
+
+def _repeat(function: Callable[[], Any], runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _new_track(directory: str):
+    from tracking.storage import TrackManager
+    return TrackManager(os.path.join(directory, "track.db"), os.path.join(directory, "track.json"))
+
+
+def _populate(track, users: int, matches_per_user: int = 10, users_per_guild: int = 100):
+    for i in range(users):
+        guild = track.get_guild(1000 + i // users_per_guild)
+        matches = [f"EUW1_{i * 100 + m}" for m in range(matches_per_user, 0, -1)]
+        guild.add_member(10**17 + i, f"bench-puuid-{i}", "EUW", f"Player{i}#EUW", matches)
+
+
+# ========== Benchmarks ==========
+async def bench_sweep(players: int, sweeps: int, server: FakeRiotServer) -> dict:
+    """Sweeps of the real MatchPoller (interval 0) over `players` tracked players, against the fake server."""
+    from riot import api
+    from riot.cache import MatchCache
+    from riot.client import RiotHTTPClient
+    from riot.ratelimit import RateLimiter
+    from tracking.poller import MatchPoller
+
+    base_url = await server.start()
+    saved = (dict(api.REGIONS), dict(api.PLATFORMS), api.limiter, api.match_cache)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Routing and platform hosts alike, so ranked (league-v4) checks never leave the machine
+        api.REGIONS.update({region: base_url for region in api.REGIONS})
+        api.PLATFORMS.update({region: base_url for region in api.PLATFORMS})
+        api.limiter = RateLimiter(server.app_limits)
+        api.match_cache = MatchCache(os.path.join(directory, "match_cache.db"))
+
+        track = _new_track(directory)
+        for i in range(players):
+            track.get_guild(1000 + i // 100).add_member(10**17 + i, f"bench-puuid-{i}", "EUW")
+        track.flush()
+
+        events = 0
+        async def on_new_match(event):
+            nonlocal events
+            events += 1
+
+        client = RiotHTTPClient()
+        poller = MatchPoller(track, client, on_new_match, interval=0)
+        track.start_writer()
+        try:
+            # The first sweep only seeds the histories
+            start = time.perf_counter()
+            await poller.sweep()
+            seed = time.perf_counter() - start
+
+            samples = []
+            requests_before = server.requests
+            for _ in range(sweeps):
+                start = time.perf_counter()
+                await poller.sweep()
+                samples.append(time.perf_counter() - start)
+            requests = server.requests - requests_before
+        finally:
+            await track.stop_writer()
+            await client.close()
+            await server.stop()
+            track.close()
+            api.match_cache.close()
+            api.REGIONS.update(saved[0])
+            api.PLATFORMS.update(saved[1])
+            api.limiter, api.match_cache = saved[2], saved[3]
+
+    total = sum(samples)
+    return {
+        "players": players,
+        "seed_sweep_ms": seed * 1000,
+        "sweeps": _timings(samples),
+        "players_per_second": players * sweeps / total if total else None,
+        "requests": requests,
+        "throttled": server.throttled,
+        "new_match_events": events,
+    }
+
+
+def bench_storage(counts: list[int]) -> list[dict]:
+    """Full save, single-change save and load of TrackManager for each tracked-user count."""
+    results = []
+    for users in counts:
+        with tempfile.TemporaryDirectory() as directory:
+            track = _new_track(directory)
+            _populate(track, users)
+
+            start = time.perf_counter()
+            track.flush()
+            save_all = time.perf_counter() - start
+
+            def save_one():
+                user = track.get_guild(1000).get_all_members()[0]
+                user.add_matches([f"EUW1_new{time.perf_counter_ns()}"])
+                track.flush()
+            save_one_samples = _repeat(save_one, 20)
+            track.close()
+
+            gc.collect()
+            load_samples = []
+            for _ in range(3):
+                loaded = _new_track(directory)
+                # The constructor is lazy, the database is only read by load()
+                start = time.perf_counter()
+                loaded.load()
+                load_samples.append(time.perf_counter() - start)
+                loaded.close()
+
+            results.append({
+                "users": users,
+                "save_all_ms": save_all * 1000,
+                "save_one": _timings(save_one_samples),
+                "load": _timings(load_samples),
+                "db_bytes": os.path.getsize(os.path.join(directory, "track.db")),
+            })
+    return results
+
+
+def bench_extractors(matches: int, runs: int) -> dict:
+    """CPU time per match of decoding and of each extraction path."""
+    from riot.decoding import decode_json, decode_match_for
+    from riot.extractors import MatchExtractor
+    from riot.records import to_match_record
+
+    bodies = list(load_recorded().values())
+    bodies += [match_body(f"EUW1_{7_000_000_000 + i}", ["bench-puuid-0"]) for i in range(matches - len(bodies))]
+    decoded = [decode_json(raw) for raw in bodies]
+    puuids = [data["metadata"]["participants"][0] for data in decoded]
+
+    def extract_all():
+        for data in decoded:
+            extractor = MatchExtractor(data)
+            for participant in extractor.participants:
+                extractor.kill_participation(participant["puuid"])
+                extractor.damage_share(participant["puuid"])
+
+    def per_match(function: Callable[[], Any]) -> dict:
+        return _timings([sample / len(bodies) for sample in _repeat(function, runs)])
+
+    return {
+        "matches": len(bodies),
+        "mean_body_bytes": statistics.fmean(len(raw) for raw in bodies),
+        "decode_full": per_match(lambda: [decode_json(raw) for raw in bodies]),
+        "decode_one_participant": per_match(lambda: [decode_match_for(raw, p) for raw, p in zip(bodies, puuids)]),
+        "to_match_record": per_match(lambda: [to_match_record(data) for data in decoded]),
+        "match_extractor": per_match(extract_all),
+    }
+
+
+async def bench_embeds(runs: int) -> dict:
+    """Members page embed (names from a stub gateway cache) and recap card build times."""
+    from embeds.embeds import show_tracking_info
+    from embeds.recap import render_recap
+    from riot.decoding import decode_json
+    from riot.records import to_match_record
+
+    results: dict[str, Any] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        track = _new_track(directory)
+        _populate(track, 10)
+        members = track.get_guild(1000).get_all_members()
+        track.close()
+
+    member = SimpleNamespace(display_name="Benchmark user")
+    guild = SimpleNamespace(id=1000, name="Benchmark guild", get_member=lambda discord_id: member)
+    interaction = SimpleNamespace(guild=guild, client=SimpleNamespace(get_user=lambda discord_id: member))
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await show_tracking_info(interaction, members, total=len(members))
+        samples.append(time.perf_counter() - start)
+    results["members_page"] = _timings(samples)
+
+    record = to_match_record(decode_json(match_body("EUW1_7000000001", ["bench-puuid-0"])))
+    participant = record.participant("bench-puuid-0")
+    render_recap(record, participant)   # icons and fonts are cached after the first card
+    results["recap_card"] = _timings(_repeat(lambda: render_recap(record, participant), runs))
+    return results
+
+
+# ========== Entry point ==========
+async def main(args: argparse.Namespace) -> dict:
+    only = set(args.only.split(",")) if args.only else {"sweep", "storage", "extractors", "embeds"}
+    results: dict[str, Any] = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "config": vars(args),
+    }
+
+    if "sweep" in only:
+        server = FakeRiotServer(latency=args.latency, error_rate=args.error_rate, app_limits=args.app_limits)
+        results["sweep"] = await bench_sweep(args.sweep_players, args.sweeps, server)
+        print(f"sweep: {results['sweep']['players_per_second']:.0f} players/s")
+
+    if "storage" in only:
+        results["storage"] = bench_storage([int(n) for n in args.users.split(",")])
+        for row in results["storage"]:
+            print(f"storage {row['users']} users: save {row['save_all_ms']:.1f}ms, load {row['load']['median_ms']:.1f}ms")
+
+    if "extractors" in only:
+        results["extractors"] = bench_extractors(args.matches, args.runs)
+        print(f"extractors: {results['extractors']['match_extractor']['median_ms']:.3f}ms per match")
+
+    if "embeds" in only:
+        results["embeds"] = await bench_embeds(args.runs)
+        print(f"embeds: recap card {results['embeds']['recap_card']['median_ms']:.1f}ms")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a fake Riot API.")
+    parser.add_argument("--out", default=None, help="JSON file to write the results to (stdout if omitted)")
+    parser.add_argument("--only", default="", help="comma-separated subset of sweep,storage,extractors,embeds")
+    parser.add_argument("--users", default="100,1000,10000,100000", help="tracked-user counts of the storage benchmark")
+    parser.add_argument("--sweep-players", type=int, default=500)
+    parser.add_argument("--sweeps", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every fake Riot response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of fake Riot responses that are 429s")
+    parser.add_argument("--app-limits", default="500:1,30000:120", help="X-App-Rate-Limit of the fake Riot API")
+    parser.add_argument("--matches", type=int, default=50, help="matches of the extractor benchmark")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    # Progress lines (and anything the bot code prints) go to stderr, so stdout stays valid JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        output = asyncio.run(main(args))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+    else:
+        json.dump(output, sys.stdout, indent=2)
+        print()
@@ -3,18 +3,19 @@ import discord
 
 from discord import app_commands
 from typing import Optional
-from aiohttp import ClientSession
 
-from riot.services import validate_region, get_puuid_and_match_id
+from riot.client import RiotHTTPClient
+from riot.services import validate_region, get_puuid_and_match_ids
 from utils.discord import validate_user, get_guild_from_interaction
+from utils import metrics
 from tracking.storage import TrackManager
-from embeds.embeds import show_tracking_info
+from embeds.pagination import MembersPaginator, get_members_page
 
 # ========== Command Registry ==========
 def register_commands(
         tree: discord.app_commands.CommandTree,
         track: TrackManager,
-        http_session: Optional[ClientSession]):
+        http_session: Optional[RiotHTTPClient]):
 
     @tree.command(name="add_user", description="Adds a user to the list ~dev-only")
     @app_commands.check(validate_user)
@@ -24,35 +25,41 @@ def register_commands(
         riot_name: str,
         region: str,
     ):
+        # Riot calls (queued by the rate limiter, retried on errors) can take longer than the 3 second deadline
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
         if http_session is None:
-            await interaction.response.send_message("Bot is not ready yet.", ephemeral=True)
+            await interaction.followup.send("Bot is not ready yet.", ephemeral=True)
             return
         
         region = region.upper()
         if not validate_region(region):
-            await interaction.response.send_message("Invalid region.", ephemeral=True)
+            await interaction.followup.send("Invalid region.", ephemeral=True)
             return
             
-        puuid, match_id = await get_puuid_and_match_id(riot_name, region, http_session)
-        if not puuid or not match_id:
-            await interaction.response.send_message("Invalid Riot name or failed to fetch player data.", ephemeral=True)
+        # Someone already tracks this Riot ID: reuse what we know instead of asking Riot again
+        player = track.index.find(riot_name, region)
+        if player is not None and player.last_seen_match:
+            puuid, match_ids = player.puuid, player.history.to_list()
+        else:
+            puuid, match_ids = await get_puuid_and_match_ids(riot_name, region, http_session)
+
+        if not puuid or not match_ids:
+            await interaction.followup.send("Invalid Riot name or failed to fetch player data.", ephemeral=True)
             return
 
         guild = get_guild_from_interaction(interaction, track)
         if not guild:
-            await interaction.response.send_message("This command must be used in a server.", ephemeral=True)
+            await interaction.followup.send("This command must be used in a server.", ephemeral=True)
             return
         
-        user = guild.add_member(discord_user.id, puuid, region)
+        user = guild.add_member(discord_user.id, puuid, region, riot_name, match_ids)
         if not user:
-            await interaction.response.send_message(f"User {discord_user.id} already exists.", ephemeral=True)
+            await interaction.followup.send(f"User {discord_user.id} already exists.", ephemeral=True)
             return
-        
-        user.puuid = puuid
-        user.matches = match_id
 
         track.save()
-        await interaction.response.send_message("User has been successfully added.", ephemeral=True)
+        await interaction.followup.send("User has been successfully added.", ephemeral=True)
 
 
     @tree.command(name="remove_user", description="Removes a user from the list ~dev-only")
@@ -82,8 +89,41 @@ def register_commands(
             await interaction.response.send_message("Guild does not exist.", ephemeral=True)
             return
 
-        user_list = guild.get_all_members()
-        embed = await show_tracking_info(interaction, user_list)
+        # Resolving names can take longer than the 3 second interaction deadline
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        paginator = MembersPaginator(guild)
+        embed = await get_members_page(interaction, guild, 0)
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, view=paginator, ephemeral=True)
+
+    @tree.command(name="set_channel", description="Sets the channel match recaps are posted in ~dev-only")
+    @app_commands.check(validate_user)
+    async def set_channel(
+        interaction: discord.Interaction,
+        channel: Optional[discord.TextChannel] = None,
+    ):
+        guild = get_guild_from_interaction(interaction, track)
+        if not guild:
+            await interaction.response.send_message("Guild does not exist.", ephemeral=True)
+            return
+
+        # Defaults to the channel the command is used in
+        target = channel or interaction.channel
+        if not isinstance(target, discord.abc.Messageable) or target.id is None:
+            await interaction.response.send_message("Recaps can't be posted in this channel.", ephemeral=True)
+            return
+
+        guild.channel_id = target.id
+        track.save()
+        await interaction.response.send_message(f"Match recaps will be posted in <#{target.id}>.", ephemeral=True)
+
+    @tree.command(name="bot_stats", description="Shows request, storage and latency metrics ~dev-only")
+    @app_commands.check(validate_user)
+    async def bot_stats(interaction: discord.Interaction):
+        summary = metrics.render_summary()
+        # Stay under the 2000 characters of a message
+        if len(summary) > 1900:
+            summary = summary[:1900] + "\n..."
+        await interaction.response.send_message(f"```\n{summary}\n```", ephemeral=True)
 
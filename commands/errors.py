@@ -2,14 +2,35 @@
 import discord
 from discord import app_commands
 
+from riot.errors import RiotAPIError, RateLimited
+
+
+# ========== Functions ==========
+async def _reply(interaction: discord.Interaction, message: str):
+    """Answers the interaction, or follows up if it was already answered/deferred."""
+    if interaction.response.is_done():
+        await interaction.followup.send(message, ephemeral=True)
+    else:
+        await interaction.response.send_message(message, ephemeral=True)
+
 
 # ========== Errors registry ==========
 def register_errors(tree):
     @tree.error
     async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
         if isinstance(error, app_commands.CheckFailure):
-            await interaction.response.send_message("You are not authorized to use this command!", ephemeral=True)
+            await _reply(interaction, "You are not authorized to use this command!")
+            return
+
+        original = getattr(error, "original", None)
+        if isinstance(original, RateLimited):
+            await _reply(interaction, "Riot's API is busy right now, try again in a minute.")
+            return
+
+        if isinstance(original, RiotAPIError):
+            print(f"Riot API error: {original}")
+            await _reply(interaction, "Riot's API is not responding, try again later.")
             return
         
         print(f"Unhandled error: {error}")
-        await interaction.response.send_message("Something went wrong. Please contact Shive.", ephemeral=True)
\ No newline at end of file
+        await _reply(interaction, "Something went wrong. Please contact Shive.")
\ No newline at end of file
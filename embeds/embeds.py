@@ -1,27 +1,98 @@
 # ========== Imports ==========
 import discord
+from datetime import datetime, timezone
+from typing import Optional
 from tracking import models
+from riot.records import MatchRecord, ParticipantRecord
+from tracking.ranked import RankedChange
+from utils.discord import resolve_display_names
 
 
 # ========== Functions ==========
 async def show_tracking_info(
         interaction: discord.Interaction,
         tracked_users_list: list[models.User],
+        total: Optional[int] = None,
+        page: int = 0,
+        page_count: int = 1,
 ) -> discord.Embed:
+    """Builds the embed listing `tracked_users_list`, which can be one page out of `total` users."""
     
     guild_name = interaction.guild.name if interaction.guild else "Unknown server"
+    if total is None:
+        total = len(tracked_users_list)
     
     embed = discord.Embed(
-        title=f"🎯 There are currently {len(tracked_users_list)} users being tracked in {guild_name}:",
+        title=f"🎯 There are currently {total} users being tracked in {guild_name}:",
         color= discord.Color.gold()
     )
+    if page_count > 1:
+        embed.set_footer(text=f"Page {page + 1}/{page_count}")
+
+    names = await resolve_display_names(
+        interaction.client,
+        interaction.guild,
+        (int(tracked_user.discord_id) for tracked_user in tracked_users_list),
+    )
 
     for tracked_user in tracked_users_list:
-        username = (await interaction.client.fetch_user(int(tracked_user.discord_id))).name
         embed.add_field(
-            name=username,
+            name=names[int(tracked_user.discord_id)],
             value=f"Discord ID: {tracked_user.discord_id}\nPUUID: {tracked_user.puuid}\nRegion: {tracked_user.region}",
             inline=False
         )
     
-    return embed
\ No newline at end of file
+    return embed
+
+# ========== Recaps ==========
+QUEUE_NAMES = {
+    400: "Normal Draft",
+    420: "Ranked Solo/Duo",
+    430: "Normal Blind",
+    440: "Ranked Flex",
+    450: "ARAM",
+    490: "Quickplay",
+    900: "ARURF",
+    1700: "Arena",
+}
+
+def build_recap_embed(
+        match: MatchRecord,
+        players: list[tuple[models.User, ParticipantRecord]],
+        ranked: Optional[dict[str, RankedChange]] = None,
+) -> discord.Embed:
+    """Builds one recap embed for every tracked player of a guild that played `match`.
+    `ranked` maps a discord_id to that player's rank change, shown under their stats."""
+    wins = {participant.win for _, participant in players}
+    if wins == {True}:
+        color, result = discord.Color.green(), "Victory"
+    elif wins == {False}:
+        color, result = discord.Color.red(), "Defeat"
+    else:
+        color, result = discord.Color.gold(), "Victory & Defeat"
+
+    queue = QUEUE_NAMES.get(match.queue_id, match.game_mode.title() or "Custom")
+    embed = discord.Embed(
+        title=f"{result} · {queue} · {match.duration // 60}:{match.duration % 60:02d}",
+        color=color,
+        timestamp=datetime.fromtimestamp(match.end_timestamp / 1000, timezone.utc) if match.end_timestamp else None,
+    )
+
+    for user, participant in players:
+        value = (
+            f"<@{user.discord_id}> · {participant.champion_name}\n"
+            f"{participant.kills}/{participant.deaths}/{participant.assists} ({participant.kda:.2f} KDA) · "
+            f"{participant.cs} CS · {participant.damage_to_champions:,} dmg"
+        )
+        change = ranked.get(user.discord_id) if ranked else None
+        if change is not None:
+            value += f"\n{change}"
+
+        embed.add_field(
+            name=f"{'🏆' if participant.win else '💀'} {user.riot_id or participant.riot_id}",
+            value=value,
+            inline=False,
+        )
+
+    embed.set_footer(text=match.match_id)
+    return embed
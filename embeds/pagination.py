@@ -0,0 +1,88 @@
+# ========== Imports ==========
+import discord
+
+from tracking import models
+from embeds.embeds import show_tracking_info
+from utils import metrics
+
+
+# ========== Constants ==========
+# Far below Discord's 25 fields / 6000 characters per embed
+MEMBERS_PER_PAGE = 10
+
+# Pages are cached per (guild, revision): adding/removing a member bumps the revision
+_members_cache: dict[str, tuple[int, list[models.User]]] = {}
+_page_cache: dict[tuple[str, int, int], discord.Embed] = {}
+
+
+# ========== Functions ==========
+def _members(guild: models.Guild) -> list[models.User]:
+    cached = _members_cache.get(guild.guild_id)
+    if cached is not None and cached[0] == guild.revision:
+        return cached[1]
+
+    # The guild changed: forget its pages of older revisions
+    for key in [key for key in _page_cache if key[0] == guild.guild_id]:
+        del _page_cache[key]
+
+    members = guild.get_all_members()
+    _members_cache[guild.guild_id] = (guild.revision, members)
+    return members
+
+
+def page_count(guild: models.Guild) -> int:
+    return max(1, -(-len(_members(guild)) // MEMBERS_PER_PAGE))
+
+
+async def get_members_page(interaction: discord.Interaction, guild: models.Guild, page: int) -> discord.Embed:
+    """Returns the embed of one page of tracked members, built only when first requested."""
+    members = _members(guild)
+    key = (guild.guild_id, guild.revision, page)
+
+    embed = _page_cache.get(key)
+    if embed is None:
+        start = page * MEMBERS_PER_PAGE
+        with metrics.embed_build.time(kind="members_page"):
+            embed = await show_tracking_info(
+                interaction,
+                members[start:start + MEMBERS_PER_PAGE],
+                total=len(members),
+                page=page,
+                page_count=page_count(guild),
+            )
+        _page_cache[key] = embed
+    return embed
+
+
+# ========== Class MembersPaginator ==========
+class MembersPaginator(discord.ui.View):
+    """Previous/next buttons over the tracked members of a guild, see `get_members_page()`."""
+
+    def __init__(self, guild: models.Guild, timeout: float = 300):
+        super().__init__(timeout=timeout)
+        self.guild = guild
+        self.page = 0
+        self._update_buttons()
+
+    def _update_buttons(self):
+        last = page_count(self.guild) - 1
+        self.page = min(self.page, last)
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= last
+
+    async def _show(self, interaction: discord.Interaction):
+        self._update_buttons()
+        # Acknowledge the click first: a page that isn't cached may fetch names over REST
+        await interaction.response.defer()
+        embed = await get_members_page(interaction, self.guild, self.page)
+        await interaction.edit_original_response(embed=embed, view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        await self._show(interaction)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        await self._show(interaction)
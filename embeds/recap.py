@@ -0,0 +1,213 @@
+# ========== Imports ==========
+import io
+import os
+import asyncio
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from PIL import Image, ImageDraw, ImageFont
+
+from riot.records import MatchRecord, ParticipantRecord
+from riot.static_data import StaticData, get_static_data
+from utils import metrics
+
+
+# ========== Constants ==========
+# Optional .ttf font, Pillow's built-in font is used otherwise
+RECAP_FONT = os.getenv("RECAP_FONT")
+
+CARD_SIZE = (640, 150)
+CHAMPION_SIZE = 96
+ITEM_SIZE = 32
+RUNE_SIZE = 28
+SPELL_SIZE = 28
+PADDING = 12
+
+WIN_COLOR = (28, 46, 74)
+LOSS_COLOR = (74, 28, 34)
+TEXT_COLOR = (240, 240, 240)
+MUTED_COLOR = (170, 170, 180)
+BAR_BACKGROUND = (20, 20, 26)
+BAR_COLOR = (232, 176, 58)
+EMPTY_SLOT_COLOR = (40, 40, 48)
+
+# Pillow releases the GIL for most of the heavy lifting, so threads are enough
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="recap")
+
+
+# ========== Class AssetAtlas ==========
+class AssetAtlas:
+    """
+    In-memory cache of the champion/item/rune/summoner spell icons of one Data Dragon version.
+
+    IDs are resolved to icon files through the lookup tables of `StaticData`, and every icon
+    is read from disk and resized on first use only, then reused for every card.
+    Missing icons become a plain placeholder square instead of failing the render.
+
+    *Functions*:
+        `champion()`: the icon of a champion, by ID (or by name for matches without `championId`).
+        `item()`: the icon of an item, by ID.
+        `rune()`: the icon of a rune or rune tree, by ID.
+        `summoner_spell()`: the icon of a summoner spell, by ID.
+    """
+
+    def __init__(self, static_data: StaticData):
+        self.static_data = static_data
+        self._icons: dict[tuple[str, object, int], Image.Image] = {}
+        self._lock = threading.Lock()
+
+    def _icon(self, kind: str, key: object, full_path: Optional[str], size: int) -> Image.Image:
+        cache_key = (kind, key, size)
+        icon = self._icons.get(cache_key)
+        if icon is not None:
+            return icon
+
+        if full_path and os.path.exists(full_path):
+            with Image.open(full_path) as source:
+                icon = source.convert("RGBA").resize((size, size), Image.LANCZOS)
+        else:
+            icon = Image.new("RGBA", (size, size), EMPTY_SLOT_COLOR)
+
+        with self._lock:
+            self._icons[cache_key] = icon
+        return icon
+
+    def champion(self, champion_id: int, name: str = "", size: int = CHAMPION_SIZE) -> Image.Image:
+        entry = self.static_data.champion(champion_id) or self.static_data.champion_by_name(name)
+        path = self.static_data.icon_path(entry)
+        if path is None and name:
+            # Directories without champion.json still name the icons after the champion
+            path = os.path.join(self.static_data.directory, "img", "champion", f"{name}.png")
+        return self._icon("champion", champion_id or name, path, size)
+
+    def item(self, item_id: int, size: int = ITEM_SIZE) -> Image.Image:
+        path = None
+        if item_id:
+            path = self.static_data.icon_path(self.static_data.item(item_id))
+            path = path or os.path.join(self.static_data.directory, "img", "item", f"{item_id}.png")
+        return self._icon("item", item_id, path, size)
+
+    def rune(self, rune_id: int, size: int = RUNE_SIZE) -> Image.Image:
+        return self._icon("rune", rune_id, self.static_data.icon_path(self.static_data.rune(rune_id)), size)
+
+    def summoner_spell(self, spell_id: int, size: int = SPELL_SIZE) -> Image.Image:
+        path = self.static_data.icon_path(self.static_data.summoner_spell(spell_id))
+        return self._icon("spell", spell_id, path, size)
+
+
+# ========== Cached drawing resources ==========
+_atlas: Optional[AssetAtlas] = None
+_fonts: dict[int, ImageFont.ImageFont] = {}
+_backgrounds: dict[bool, Image.Image] = {}
+
+
+def get_atlas() -> AssetAtlas:
+    global _atlas
+    static_data = get_static_data()
+    # A new patch swapped in by `set_static_data()` gets a fresh atlas, the old icons are dropped with the old one
+    if _atlas is None or _atlas.static_data is not static_data:
+        _atlas = AssetAtlas(static_data)
+    return _atlas
+
+
+def _font(size: int) -> ImageFont.ImageFont:
+    font = _fonts.get(size)
+    if font is None:
+        if RECAP_FONT:
+            font = ImageFont.truetype(RECAP_FONT, size)
+        else:
+            font = ImageFont.load_default(size)
+        _fonts[size] = font
+    return font
+
+
+def _background(win: bool) -> Image.Image:
+    background = _backgrounds.get(win)
+    if background is None:
+        background = Image.new("RGBA", CARD_SIZE, WIN_COLOR if win else LOSS_COLOR)
+        draw = ImageDraw.Draw(background)
+        draw.rectangle((0, 0, 5, CARD_SIZE[1]), fill=(80, 160, 255) if win else (230, 70, 80))
+        _backgrounds[win] = background
+    return background
+
+
+# ========== Functions ==========
+def render_recap(match: MatchRecord, participant: ParticipantRecord) -> bytes:
+    """Renders the recap card of one participant of a finished match.
+
+    Blocking (CPU-bound), use `render_recap_async()` from the event loop.
+
+    Args:
+        match (MatchRecord): The finished match.
+        participant (ParticipantRecord): The tracked participant.
+
+    Returns:
+        bytes: The card as a PNG.
+    """
+    atlas = get_atlas()
+    card = _background(participant.win).copy()
+    draw = ImageDraw.Draw(card)
+
+    # Champion
+    x = PADDING + 6
+    y = (CARD_SIZE[1] - CHAMPION_SIZE) // 2
+    card.paste(atlas.champion(participant.champion_id, participant.champion_name), (x, y))
+
+    # Summoner spells, then runes: keystone above the secondary tree
+    x += CHAMPION_SIZE + 6
+    for row, spell_id in enumerate(participant.summoner_spells):
+        card.paste(atlas.summoner_spell(spell_id), (x, y + 10 + row * (SPELL_SIZE + 10)))
+
+    x += SPELL_SIZE + 4
+    keystone = atlas.rune(participant.perks[0] if participant.perks else 0)
+    sub_style = atlas.rune(participant.sub_style)
+    card.paste(keystone, (x, y + 10), keystone)
+    card.paste(sub_style, (x, y + 20 + RUNE_SIZE), sub_style)
+
+    # Result, KDA, CS and duration
+    x += RUNE_SIZE + PADDING
+    minutes = max(match.duration / 60, 1)
+    result = "Victory" if participant.win else "Defeat"
+    # Display name ("Wukong") rather than the internal one ("MonkeyKing") when the patch knows it
+    champion = atlas.static_data.champion(participant.champion_id)
+    champion_name = champion.name if champion else participant.champion_name
+    draw.text((x, y), f"{result}  ·  {champion_name}", font=_font(20), fill=TEXT_COLOR)
+    draw.text(
+        (x, y + 28),
+        f"{participant.kills} / {participant.deaths} / {participant.assists}   ({participant.kda:.2f} KDA)",
+        font=_font(18),
+        fill=TEXT_COLOR,
+    )
+    draw.text(
+        (x, y + 52),
+        f"{participant.cs} CS ({participant.cs / minutes:.1f}/min)  ·  {match.duration // 60}:{match.duration % 60:02d}",
+        font=_font(14),
+        fill=MUTED_COLOR,
+    )
+
+    # Items
+    item_y = y + 72
+    for slot, item_id in enumerate(participant.items):
+        card.paste(atlas.item(item_id), (x + slot * (ITEM_SIZE + 3), item_y))
+
+    # Damage bar, relative to the highest damage of the match
+    bar_x = CARD_SIZE[0] - 170
+    bar_width = 150
+    top_damage = match.top_damage or 1
+    filled = int(bar_width * participant.damage_to_champions / top_damage)
+    draw.text((bar_x, y + 28), f"{participant.damage_to_champions:,} dmg", font=_font(14), fill=MUTED_COLOR)
+    draw.rectangle((bar_x, y + 48, bar_x + bar_width, y + 60), fill=BAR_BACKGROUND)
+    draw.rectangle((bar_x, y + 48, bar_x + filled, y + 60), fill=BAR_COLOR)
+
+    output = io.BytesIO()
+    # Fast compression: the card is small and sent once
+    card.save(output, format="PNG", compress_level=1)
+    return output.getvalue()
+
+
+async def render_recap_async(match: MatchRecord, participant: ParticipantRecord) -> bytes:
+    """Same as `render_recap()`, but runs on the renderer thread pool so the event loop never blocks."""
+    loop = asyncio.get_running_loop()
+    with metrics.embed_build.time(kind="recap"):
+        return await loop.run_in_executor(_executor, render_recap, match, participant)
@@ -7,10 +7,15 @@ This project is licensed under the MIT License.
 
 
 # ========== Imports ==========
+import time
+STARTED_AT = time.perf_counter()    # before the heavy imports, for the startup timings
+
 import os
+import asyncio
 import dotenv
 import discord
-import aiohttp
+
+from datetime import datetime, timezone
 
 dotenv.load_dotenv()
 
@@ -19,14 +24,74 @@ from commands.commands import register_commands
 from commands.errors import register_errors
 
 from tracking.storage import TrackManager
+from tracking.poller import MatchPoller, NewMatch
+from tracking.delivery import RecapDelivery
+from riot.client import RiotHTTPClient
+from riot.static_data import get_static_data
+from utils import metrics
+from utils.discord import sync_commands
+
+# Cheap: the database is only read in setup_hook, on a worker thread
 track = TrackManager()
 
+MY_GUILD = discord.Object(id=1461904966212911297)
+
+
+def mark_startup(phase: str):
+    elapsed = time.perf_counter() - STARTED_AT
+    metrics.startup.observe(elapsed, phase=phase)
+    print(f"Startup: {phase} after {elapsed:.2f}s")
+
+
 # ========== Setup ==========
+class TrackerClient(discord.Client):
+    """discord.Client that owns the lifetime of the Riot HTTP client, poller and storage writer."""
+
+    async def setup_hook(self):
+        # runs once before the first connect, unlike on_ready which fires on every reconnect
+        global http_client, storage_task, static_data_task
+        http_client = RiotHTTPClient()
+
+        # load the tracked users while the gateway connects instead of before
+        storage_task = asyncio.create_task(load_storage())
+        # build the Data Dragon lookup tables off the event loop, before the first recap needs them
+        static_data_task = asyncio.create_task(asyncio.to_thread(get_static_data))
+
+        register_commands(tree, track, http_client)
+        register_errors(tree)
+        tree.copy_global_to(guild=MY_GUILD)
+
+        # Prometheus text endpoint, only when METRICS_PORT is set
+        global metrics_runner
+        metrics_runner = await metrics.start_metrics_server()
+
+    async def close(self):
+        # real shutdown only, on_disconnect also fires on every gateway reconnect
+        if poller is not None:
+            await poller.stop()
+        await delivery.stop()
+        await track.stop_writer()
+        if http_client is not None:
+            await http_client.close()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        await super().close()
+
+
 intents = discord.Intents.default()
 intents.message_content = True
-client = discord.Client(intents=intents)
+client = TrackerClient(intents=intents)
+delivery = RecapDelivery(client, track)
 
-http_session: aiohttp.ClientSession | None = None
+http_client: RiotHTTPClient | None = None
+poller: MatchPoller | None = None
+metrics_runner = None
+storage_task: asyncio.Task | None = None
+static_data_task: asyncio.Task | None = None
+
+# on_ready fires again on every reconnect, the startup work only runs on the first one
+started = False
+first_command_done = False
 
 tree = app_commands.CommandTree(client)
 
@@ -36,27 +101,76 @@ token = os.getenv("DISCORD_TOKEN")
 if token is None:
     raise RuntimeError("DISCORD_TOKEN environment variable not set")
 
+async def load_storage():
+    await track.load_async()
+    mark_startup("storage_loaded")
+
+
 @client.event
 async def on_ready():
     print(f"Logged in as {client.user}")
 
-    # open http_session
-    global http_session
-    if http_session is None:
-        http_session = aiohttp.ClientSession()
-
-    register_commands(tree, track, http_session)
-    register_errors(tree)
-    
-    # sync with test server
-    MY_GUILD = discord.Object(id=1461904966212911297)
-    tree.copy_global_to(guild=MY_GUILD)
-    await tree.sync(guild=MY_GUILD)
-
-    # sync all joined guilds
-    async for guild in client.fetch_guilds():
+    global started, poller, storage_task
+    if started:
+        return
+    started = True
+    mark_startup("ready")
+
+    # sync with test server, only when the commands changed since the last sync;
+    # a failed sync isn't hashed, so the next restart tries again
+    try:
+        if await sync_commands(tree, guild=MY_GUILD):
+            print("Command tree synced")
+    except discord.HTTPException as e:
+        print(f"Syncing the command tree failed: {e}")
+
+    if storage_task is not None:
+        try:
+            await storage_task
+        except Exception as e:
+            # nothing below works without the tracked users: load again and retry on the next on_ready
+            print(f"Loading the tracked users failed: {e}")
+            storage_task = asyncio.create_task(load_storage())
+            started = False
+            return
+
+    # a broken Data Dragon file only shows up here, recaps try to build the tables again when they render
+    if static_data_task is not None:
+        try:
+            await static_data_task
+        except Exception as e:
+            print(f"Loading the Data Dragon static data failed: {e}")
+
+    # write changes behind the event loop instead of inside every command
+    track.start_writer()
+
+    # reconcile joined guilds once, from the gateway cache; on_guild_join/remove keep it up to date after
+    for guild in client.guilds:
         track.add_guild(guild.id)
     track.save()
+    mark_startup("commands_available")
+
+    # start posting recaps, then polling for new matches
+    delivery.start()
+    poller = MatchPoller(track, http_client, on_new_match)
+    poller.start()
+
+
+@client.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    # from Discord creating the interaction to the command returning (includes gateway latency)
+    elapsed = (datetime.now(timezone.utc) - interaction.created_at).total_seconds()
+    metrics.interaction_latency.observe(elapsed, command=command.name)
+
+    global first_command_done
+    if not first_command_done:
+        first_command_done = True
+        mark_startup("first_command")
+
+
+async def on_new_match(event: NewMatch):
+    print(f"New match {event.match_id} for {len(event.subscribers)} tracked user(s)")
+    await delivery.submit(event)
 
 
 @client.event
@@ -69,10 +183,9 @@ async def on_guild_remove(guild: discord.Guild):
     track.remove_guild(guild.id)
     track.save()
 
-@client.event
-async def on_disconnect():
-    if http_session:
-        await http_session.close()
-
 if __name__ == "__main__":
-    client.run(token)
+    try:
+        client.run(token)
+    finally:
+        # flush whatever the background writer didn't get to
+        track.close()
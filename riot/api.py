@@ -1,9 +1,20 @@
 # ========== Imports ==========
 import os
+import time
+import random
+import asyncio
 import aiohttp
 
-from typing import Optional
-from riot.riot_types import MatchData
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, TypeVar, Union
+from urllib.parse import urlencode
+from riot.riot_types import MatchData, LeagueEntryData, CurrentGameInfo
+from riot.ratelimit import RateLimiter
+from riot.cache import MatchCache
+from riot.client import RiotHTTPClient
+from riot.decoding import decode_json, decode_match_for
+from riot.errors import RiotAPIError, NotFound, RateLimited, UpstreamError, RequestTimeout
+from utils import metrics
 
 
 # ========== Configuration ==========
@@ -42,13 +53,187 @@ REGIONS = {
     "VN": "https://sea.api.riotgames.com",
 }
 
+# Platform hosts, for the endpoints that live on a single server (league-v4, spectator-v5, ...)
+PLATFORMS = {
+    # AMERICAS
+    "NA": "https://na1.api.riotgames.com",
+    "BR": "https://br1.api.riotgames.com",
+    "LAN": "https://la1.api.riotgames.com",
+    "LAS": "https://la2.api.riotgames.com",
+    "OCE": "https://oc1.api.riotgames.com",
+    "PBE": "https://pbe1.api.riotgames.com",
+
+    # EUROPES
+    "EUW": "https://euw1.api.riotgames.com",
+    "EUNE": "https://eun1.api.riotgames.com",
+    "TR": "https://tr1.api.riotgames.com",
+    "RU": "https://ru.api.riotgames.com",
+
+    # ASIA
+    "KR": "https://kr.api.riotgames.com",
+    "JP": "https://jp1.api.riotgames.com",
+
+    # RANDOMS ASIA
+    "PH": "https://ph2.api.riotgames.com",
+    "SG": "https://sg2.api.riotgames.com",
+    "TW": "https://tw2.api.riotgames.com",
+    "TH": "https://th2.api.riotgames.com",
+    "VN": "https://vn2.api.riotgames.com",
+}
+
+# Attempts per request before the last error is raised (429s, 5xx, timeouts and connection errors are retried)
+MAX_ATTEMPTS = 4
+
+# Seconds before a single attempt is abandoned
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+# Exponential backoff between retries: base * 2^attempt seconds, capped, with full jitter
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# Requests in flight at once for the batch functions (the rate limiter still has the last word)
+BATCH_CONCURRENCY = int(os.getenv("RIOT_BATCH_CONCURRENCY", "8"))
+
+# One limiter shared by every call, keyed by routing host and endpoint
+limiter = RateLimiter()
+
+# Finished matches never change, so they are downloaded once (the database is opened on first use)
+match_cache = MatchCache()
+
+
+# ========== Request helpers ==========
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds of a `Retry-After` header, None if it's missing or not a number."""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _host_label(region_url: str) -> str:
+    """https://europe.api.riotgames.com -> europe"""
+    return region_url.split("//", 1)[-1].split(".", 1)[0]
+
+
+async def _get(
+    region_url: str,
+    method: str,
+    path: str,
+    session: RiotHTTPClient
+) -> bytes:
+    """Sends a rate-limited GET request and returns the raw body.
+
+    Waits on the shared limiter before every attempt. 429s are re-queued on the limiter (which honors
+    `Retry-After`), 5xx, timeouts and connection errors are retried with jittered exponential backoff.
+
+    Args:
+        region_url (str): The routing or platform host, a value from `REGIONS` or `PLATFORMS`.
+        method (str): Name of the endpoint, used as the method rate-limit key.
+        path (str): Path of the request, appended to `region_url`.
+
+    Raises:
+        NotFound: Riot answered 404.
+        RateLimited, UpstreamError, RequestTimeout: the error persisted through every attempt.
+        RiotAPIError: any other non-200 answer (e.g. 401/403 for a bad key), not retried.
+
+    Returns:
+        bytes: The response body.
+    """
+    url = f"{region_url}{path}"
+    host = _host_label(region_url)
+    error: RiotAPIError = RiotAPIError(f"{method}: no attempt made")
+
+    for attempt in range(MAX_ATTEMPTS):
+        with metrics.ratelimit_wait.time(method=method):
+            await limiter.acquire(region_url, method)
+
+        start = time.perf_counter()
+        status_label = "error"
+        try:
+            async with session.get(url, headers=_get_headers(), timeout=REQUEST_TIMEOUT) as response:
+                limiter.update(region_url, method, response.status, response.headers)
+                status = response.status
+                status_label = str(status)
+
+                if status == 200:
+                    return await response.read()
+
+                if status == 404:
+                    raise NotFound(f"{method}: not found", status)
+
+                if status == 429:
+                    error = RateLimited(f"{method}: rate limited", _retry_after(response.headers.get("Retry-After")))
+                    # The limiter already blocks the bucket for Retry-After
+                    continue
+
+                if status < 500:
+                    raise RiotAPIError(f"{method}: unexpected status {status}", status)
+
+                error = UpstreamError(f"{method}: server error {status}", status)
+
+        except asyncio.TimeoutError:
+            status_label = "timeout"
+            error = RequestTimeout(f"{method}: timed out")
+        except aiohttp.ClientError as e:
+            error = UpstreamError(f"{method}: {e}")
+        finally:
+            metrics.riot_requests.inc(endpoint=method, host=host, status=status_label)
+            metrics.riot_latency.observe(time.perf_counter() - start, endpoint=method, host=host, status=status_label)
+
+        if attempt < MAX_ATTEMPTS - 1:
+            await asyncio.sleep(_backoff(attempt))
+
+    raise error
+
+
+async def _get_json(
+    region_url: str,
+    method: str,
+    path: str,
+    session: RiotHTTPClient
+) -> Any:
+    """Same as `_get()`, but returns the decoded JSON body."""
+    return decode_json(await _get(region_url, method, path, session))
+
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+async def _bounded(
+    jobs: Iterable[tuple[K, Callable[[], Awaitable[V]]]],
+    concurrency: int
+) -> AsyncIterator[tuple[K, Union[V, RiotAPIError]]]:
+    """Runs the jobs with at most `concurrency` in flight and yields (key, result) as they complete.
+    A failed job yields its RiotAPIError instead of stopping the others."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(key: K, job: Callable[[], Awaitable[V]]) -> tuple[K, Union[V, RiotAPIError]]:
+        async with semaphore:
+            try:
+                return key, await job()
+            except RiotAPIError as e:
+                return key, e
+
+    tasks = [asyncio.ensure_future(run(key, job)) for key, job in jobs]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The caller stopped iterating early
+        for task in tasks:
+            task.cancel()
+
 
 # ========== Functions ==========
 async def get_puuid(
     game_name: str,
     tag_line: str,
     region_code: RegionCode,
-    session: aiohttp.ClientSession
+    session: RiotHTTPClient
 ) -> Optional[str]:
     """Retrieves PUUID from name-tag and region.
 
@@ -57,30 +242,68 @@ async def get_puuid(
         tag_line (str): Tag (#)
         region_code (RegionCode): Region code in which the user resides.
 
+    Raises:
+        RiotAPIError: `NotFound` if the Riot ID doesn't exist, see `_get()` for the others.
+
     Returns:
-        Optional[str]: The corresponding PUUID or None if error.
+        Optional[str]: The corresponding PUUID or None if the region is unknown.
     """
 
     region_url = REGIONS.get(region_code)
     if region_url is None:
         return None
 
-    full_url = f"{region_url}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+    path = f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
 
-    async with session.get(full_url, headers=_get_headers()) as response:
-        if response.status == 200:
-            data = await response.json()
-            return data.get("puuid")
+    data = await _get_json(region_url, "account-v1.by-riot-id", path, session)
+    return data.get("puuid")
+
+
+async def get_match_ids(
+    puuid: str,
+    region: RegionCode,
+    session: RiotHTTPClient,
+    start: int = 0,
+    count: int = 20,
+    start_time: Optional[int] = None,
+    queue: Optional[int] = None
+) -> list[str]:
+    """Retrieves a page of match IDs (newest first) from PUUID and region.
+
+    Args:
+        puuid (str): The user's PUUID
+        region (RegionCode): Region code in which the user resides.
+        start (int): Index of the first match to return.
+        count (int): Number of matches to return (0-100).
+        start_time (int, optional): Only matches after this epoch timestamp, in seconds.
+        queue (int, optional): Only matches of this queue ID.
+
+    Raises:
+        RiotAPIError: see `_get()`.
+
+    Returns:
+        list[str]: The match IDs, empty if there are none (or the region is unknown).
+    """
+
+    region_url = REGIONS.get(region)
+    if region_url is None:
+        return []
+
+    params: dict[str, int] = {"start": start, "count": count}
+    if start_time is not None:
+        params["startTime"] = start_time
+    if queue is not None:
+        params["queue"] = queue
+
+    path = f"/lol/match/v5/matches/by-puuid/{puuid}/ids?{urlencode(params)}"
+
+    return await _get_json(region_url, "match-v5.ids", path, session)
 
-        else:
-            print(f"Error: {response.status}")
-            return None
-            
 
 async def get_match_id(
     puuid: str,
     region: RegionCode,
-    session: aiohttp.ClientSession
+    session: RiotHTTPClient
 ) -> Optional[str]:
     """Retrieves most recent match from PUUID and region.
 
@@ -88,54 +311,157 @@ async def get_match_id(
         puuid (str): The user's PUUID
         region (RegionCode): Region code in which the user resides.
 
+    Raises:
+        RiotAPIError: see `_get()`.
+
     Returns:
-        Optional[str]: The corresponding match ID or None if error.
+        Optional[str]: The corresponding match ID or None if there is none (or the region is unknown).
     """
     
-    region_url = REGIONS.get(region)
-    if region_url is None:
+    data = await get_match_ids(puuid, region, session, count=1)
+    if not data:
         return None
 
-    full_url = f"{region_url}/lol/match/v5/matches/by-puuid/{puuid}/ids"
-
-    async with session.get(full_url, headers=_get_headers()) as response:
-        if response.status == 200:
-            data: list[str] = await response.json()
-        
-            if not data:
-                return None
-            
-            return data[0]
-        
-        else:
-            print(f"Error: {response.status}")
-            return None
+    return data[0]
 
 
 async def get_match_data(
     match_id: str,
     region: RegionCode,
-    session: aiohttp.ClientSession
+    session: RiotHTTPClient,
+    puuid: Optional[str] = None
 ) -> Optional[MatchData]:
-    """Retrieves the data of a match ID and region.
+    """Retrieves the data of a match ID and region. Served from the local match cache when possible.
 
     Args:
         match_id (str): The ID of the match.
         region (RegionCode): Region code in which the user resides.
+        puuid (str, optional): Opt-in partial decode: only this participant is kept in `info.participants`
+            (see `decode_match_for()`). The full match is still cached.
+
+    Raises:
+        RiotAPIError: `NotFound` if the match doesn't exist (yet), see `_get()` for the others.
 
     Returns:
-        Optional[dict[str, Any]]: A dictionary where each key is a string describing the statistic and a value of type Any. Returns None if error.
+        Optional[dict[str, Any]]: A dictionary where each key is a string describing the statistic and a value of type Any. Returns None if the region is unknown.
     """
 
     region_url = REGIONS.get(region)
     if region_url is None:
         return None
 
-    full_url = f"{region_url}/lol/match/v5/matches/{match_id}"
+    raw = await asyncio.to_thread(match_cache.get, match_id)
+    if raw is None:
+        path = f"/lol/match/v5/matches/{match_id}"
+        raw = await _get(region_url, "match-v5.match", path, session)
+        await asyncio.to_thread(match_cache.put, match_id, raw)
+
+    if puuid is not None:
+        return decode_match_for(raw, puuid)
+    return decode_json(raw)
+
+
+async def get_ranked_entries(
+    puuid: str,
+    region: RegionCode,
+    session: RiotHTTPClient
+) -> list[LeagueEntryData]:
+    """Retrieves the ranked entries (one per ranked queue played this season) of a PUUID.
+
+    Args:
+        puuid (str): The user's PUUID
+        region (RegionCode): Region code in which the user resides.
 
-    async with session.get(full_url, headers=_get_headers()) as response:
-        if response.status == 200:
-            return await response.json()
-        else:
-            print(f"Error: {response.status}")
-            return None
\ No newline at end of file
+    Raises:
+        RiotAPIError: see `_get()`.
+
+    Returns:
+        list[LeagueEntryData]: The entries, empty if the player is unranked (or the region is unknown).
+    """
+
+    platform_url = PLATFORMS.get(region)
+    if platform_url is None:
+        return []
+
+    path = f"/lol/league/v4/entries/by-puuid/{puuid}"
+
+    return await _get_json(platform_url, "league-v4.entries", path, session)
+
+
+async def get_active_game(
+    puuid: str,
+    region: RegionCode,
+    session: RiotHTTPClient
+) -> Optional[CurrentGameInfo]:
+    """Retrieves the game a PUUID is playing right now.
+
+    Args:
+        puuid (str): The user's PUUID
+        region (RegionCode): Region code in which the user resides.
+
+    Raises:
+        RiotAPIError: see `_get()` (a 404 is not raised, it means "not in game").
+
+    Returns:
+        Optional[CurrentGameInfo]: The game in progress, or None if not in game (or the region is unknown).
+    """
+
+    platform_url = PLATFORMS.get(region)
+    if platform_url is None:
+        return None
+
+    path = f"/lol/spectator/v5/active-games/by-summoner/{puuid}"
+
+    try:
+        return await _get_json(platform_url, "spectator-v5.active-game", path, session)
+    except NotFound:
+        return None
+
+
+# ========== Batch functions ==========
+async def iter_match_ids(
+    players: Iterable[tuple[str, RegionCode]],
+    session: RiotHTTPClient,
+    concurrency: int = BATCH_CONCURRENCY,
+    start: int = 0,
+    count: int = 20,
+    start_time: Optional[int] = None,
+    queue: Optional[int] = None
+) -> AsyncIterator[tuple[str, Union[list[str], RiotAPIError]]]:
+    """Retrieves the match IDs of many players concurrently, yielding them as they complete.
+
+    Args:
+        players (Iterable[tuple[str, RegionCode]]): (puuid, region) pairs.
+        concurrency (int): Maximum requests in flight, on top of the shared rate limiter.
+        start, count, start_time, queue: see `get_match_ids()`.
+
+    Returns:
+        AsyncIterator: (puuid, match IDs) pairs, or (puuid, RiotAPIError) when that player failed.
+    """
+    jobs = (
+        (puuid, partial(get_match_ids, puuid, region, session, start, count, start_time, queue))
+        for puuid, region in players
+    )
+    async for result in _bounded(jobs, concurrency):
+        yield result
+
+
+async def iter_match_data(
+    match_ids: Iterable[str],
+    region: RegionCode,
+    session: RiotHTTPClient,
+    concurrency: int = BATCH_CONCURRENCY
+) -> AsyncIterator[tuple[str, Union[Optional[MatchData], RiotAPIError]]]:
+    """Retrieves many matches of one region concurrently, yielding them as they complete.
+
+    Args:
+        match_ids (Iterable[str]): The IDs of the matches.
+        region (RegionCode): Region code in which the matches were played.
+        concurrency (int): Maximum requests in flight, on top of the shared rate limiter.
+
+    Returns:
+        AsyncIterator: (match ID, MatchData) pairs, or (match ID, RiotAPIError) when that match failed.
+    """
+    jobs = ((match_id, partial(get_match_data, match_id, region, session)) for match_id in match_ids)
+    async for result in _bounded(jobs, concurrency):
+        yield result
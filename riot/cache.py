@@ -0,0 +1,249 @@
+# ========== Imports ==========
+import os
+import time
+import zlib
+import sqlite3
+import threading
+
+from collections import OrderedDict
+from typing import Optional
+
+
+# ========== Constants ==========
+MATCH_CACHE_FILE = "riot/match_cache.db"
+
+# Size budget of the compressed payloads, least recently used matches are evicted above it
+MATCH_CACHE_MAX_BYTES = int(os.getenv("MATCH_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Once over budget, the cache is trimmed down to this share of it, so eviction doesn't run on every put
+MATCH_CACHE_LOW_WATER = 0.9
+
+# Matches deleted per eviction query
+EVICT_BATCH = 256
+
+# Reads only update `last_access` in memory; they are written per this many matches or seconds
+TOUCH_BATCH = 256
+TOUCH_INTERVAL = 60.0
+
+PUUID_CACHE_FILE = "riot/puuid_cache.db"
+
+# Seconds a resolved Riot ID is trusted (names can change), and how long a 404 is remembered
+PUUID_CACHE_TTL = float(os.getenv("PUUID_CACHE_TTL", str(7 * 24 * 3600)))
+PUUID_NEGATIVE_TTL = float(os.getenv("PUUID_NEGATIVE_TTL", "300"))
+
+# Entries kept in memory
+PUUID_CACHE_SIZE = 4096
+
+# Returned by `PuuidCache.get()` when the Riot ID is known not to exist
+NOT_FOUND = ""
+
+
+# ========== Class MatchCache ==========
+class MatchCache:
+    """
+    On-disk cache for Match-V5 payloads. A finished match never changes, so it is downloaded once.
+
+    Payloads are stored zlib-compressed in a SQLite blob table keyed by match ID.
+    When the total compressed size grows over `max_bytes`, the least recently used matches are evicted
+    down to `MATCH_CACHE_LOW_WATER` of it. Access times of reads are batched, so a read is only a SELECT.
+    The database is opened on first use, so importing the module never touches the disk.
+    The methods are blocking and thread-safe; call them with `asyncio.to_thread()` from the event loop.
+
+    *Functions*:
+        `get()`: returns the raw JSON of a match, or None if it isn't cached.
+        `put()`: stores the raw JSON of a match.
+    """
+
+    def __init__(self, path: str = MATCH_CACHE_FILE, max_bytes: int = MATCH_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._size = 0
+        self._touched: dict[str, float] = {}    # match_id -> last access not written yet
+        self._touched_flushed = time.monotonic()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """The connection, opened on first use. Only used with `_lock` held."""
+        if self._connection is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            # A lost last transaction only means a match downloaded again, no fsync per commit needed
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS matches ("
+                "match_id TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS matches_by_access ON matches (last_access)")
+            self._size = db.execute("SELECT COALESCE(SUM(size), 0) FROM matches").fetchone()[0]
+            self._connection = db
+        return self._connection
+
+    def get(self, match_id: str) -> Optional[bytes]:
+        """Returns the raw (decompressed) JSON of a cached match, or None if it isn't cached."""
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+            if row is None:
+                return None
+
+            self._touched[match_id] = time.time()
+            if len(self._touched) >= TOUCH_BATCH or time.monotonic() - self._touched_flushed >= TOUCH_INTERVAL:
+                with self._db:
+                    self._write_touched()
+
+        return zlib.decompress(row[0])
+
+    def put(self, match_id: str, raw: bytes):
+        """Stores the raw JSON of a match and evicts the least recently used ones if over budget."""
+        payload = zlib.compress(raw)
+
+        with self._lock, self._db:
+            old = self._db.execute("SELECT size FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+            if old is not None:
+                self._size -= old[0]
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO matches (match_id, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (match_id, payload, len(payload), time.time()),
+            )
+            self._size += len(payload)
+
+            if self._size > self.max_bytes:
+                # Recent reads count for the LRU order
+                self._write_touched()
+                self._evict()
+
+    def _write_touched(self):
+        """Writes the batched access times. Called with `_lock` held, inside a transaction."""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE matches SET last_access = ? WHERE match_id = ?",
+                [(accessed, match_id) for match_id, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+        self._touched_flushed = time.monotonic()
+
+    def _evict(self):
+        """Deletes the least recently used matches, a batch at a time, until the low-water mark."""
+        target = self.max_bytes * MATCH_CACHE_LOW_WATER
+        while self._size > target:
+            rows = self._db.execute(
+                "SELECT match_id, size FROM matches ORDER BY last_access LIMIT ?", (EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+
+            evicted = []
+            for match_id, size in rows:
+                if self._size <= target:
+                    break
+                evicted.append((match_id,))
+                self._size -= size
+            self._db.executemany("DELETE FROM matches WHERE match_id = ?", evicted)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                with self._connection:
+                    self._write_touched()
+                self._connection.close()
+                self._connection = None
+
+
+# ========== Class PuuidCache ==========
+class PuuidCache:
+    """
+    Riot ID -> PUUID cache, keyed by (game_name, tag_line, routing host).
+
+    Resolved IDs live in an in-memory LRU and in SQLite so they survive restarts, both expiring after `ttl`.
+    IDs that Riot answered 404 for are remembered in memory only, for `negative_ttl` seconds.
+    Like `MatchCache`, the database is opened on first use and the methods are blocking and thread-safe;
+    call them with `asyncio.to_thread()` from the event loop.
+
+    *Functions*:
+        `get()`: returns the PUUID, `NOT_FOUND` for a remembered 404, or None if unknown.
+        `put()`: stores a resolved PUUID.
+        `put_not_found()`: remembers a 404.
+    """
+
+    def __init__(
+            self,
+            path: str = PUUID_CACHE_FILE,
+            ttl: float = PUUID_CACHE_TTL,
+            negative_ttl: float = PUUID_NEGATIVE_TTL,
+            size: int = PUUID_CACHE_SIZE):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.size = size
+
+        # key -> (puuid or NOT_FOUND, expires_at)
+        self._memory: OrderedDict[tuple[str, str, str], tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """The connection, opened on first use. Only used with `_lock` held."""
+        if self._connection is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS riot_ids ("
+                "game_name TEXT NOT NULL, tag_line TEXT NOT NULL, host TEXT NOT NULL, "
+                "puuid TEXT NOT NULL, expires_at REAL NOT NULL, "
+                "PRIMARY KEY (game_name, tag_line, host))"
+            )
+            self._connection = db
+        return self._connection
+
+    @staticmethod
+    def _key(game_name: str, tag_line: str, host: str) -> tuple[str, str, str]:
+        # Riot IDs are case-insensitive
+        return game_name.casefold(), tag_line.casefold(), host
+
+    def _remember(self, key: tuple[str, str, str], value: str, expires_at: float):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+    def get(self, game_name: str, tag_line: str, host: str) -> Optional[str]:
+        key = self._key(game_name, tag_line, host)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    return entry[0]
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT puuid, expires_at FROM riot_ids WHERE game_name = ? AND tag_line = ? AND host = ?", key
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, game_name: str, tag_line: str, host: str, puuid: str):
+        key = self._key(game_name, tag_line, host)
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._remember(key, puuid, expires_at)
+            with self._db:
+                self._db.execute("INSERT OR REPLACE INTO riot_ids VALUES (?, ?, ?, ?, ?)", (*key, puuid, expires_at))
+
+    def put_not_found(self, game_name: str, tag_line: str, host: str):
+        with self._lock:
+            self._remember(self._key(game_name, tag_line, host), NOT_FOUND, time.time() + self.negative_ttl)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,71 @@
+# ========== Imports ==========
+import os
+import aiohttp
+
+from typing import Any
+from yarl import URL
+
+
+# ========== Constants ==========
+# Open connections per routing host, above the rate limits so requests never queue on the pool
+CONNECTIONS_PER_HOST = int(os.getenv("RIOT_CONNECTIONS_PER_HOST", "10"))
+
+# Seconds a DNS answer and an idle keep-alive connection are reused
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+
+# ========== Class RiotHTTPClient ==========
+class RiotHTTPClient:
+    """
+    Long-lived HTTP client for the Riot API with one warm connection pool per routing host.
+
+    Each host (americas, europe, asia, sea, ...) gets its own `ClientSession` with a tuned `TCPConnector`,
+    created on first use, so steady-state polling reuses TLS connections instead of re-handshaking.
+    Create it once at startup and `close()` it only on real shutdown, not on a gateway reconnect.
+
+    *Functions*:
+        `get()`: same as `ClientSession.get()`, dispatched to the pool of the URL's host.
+        `close()`: closes every pool.
+    """
+
+    def __init__(
+            self,
+            connections_per_host: int = CONNECTIONS_PER_HOST,
+            dns_cache_ttl: int = DNS_CACHE_TTL,
+            keepalive_timeout: float = KEEPALIVE_TIMEOUT):
+        self.connections_per_host = connections_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _session_for(self, host: str) -> aiohttp.ClientSession:
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connections_per_host,
+                limit_per_host=self.connections_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = self._sessions[host] = aiohttp.ClientSession(connector=connector)
+        return session
+
+    def get(self, url: str, **kwargs: Any):
+        """Sends a GET request through the pool of the URL's host. Use it as `async with client.get(...)`."""
+        if self._closed:
+            raise RuntimeError("RiotHTTPClient is closed")
+
+        host = URL(url).host or ""
+        return self._session_for(host).get(url, **kwargs)
+
+    async def close(self):
+        self._closed = True
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
@@ -0,0 +1,101 @@
+# ========== Imports ==========
+import io
+import json
+
+from typing import Any, Optional
+from riot.riot_types import MatchData
+
+# Optional faster backends, the standard library is used when they aren't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# ========== Constants ==========
+# Parts of the match that are materialized as a whole in a partial decode
+_KEPT_SUBTREES = ("metadata", "info.teams")
+
+_PARTICIPANT = "info.participants.item"
+
+_SCALAR_EVENTS = ("string", "number", "boolean", "null")
+
+
+# ========== Functions ==========
+def decode_json(raw: bytes) -> Any:
+    """Decodes a JSON body with orjson when it's installed, else with the standard library."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def decode_match_for(raw: bytes, puuid: str) -> MatchData:
+    """Decodes a Match-V5 body, keeping only the participant with `puuid` in `info.participants`.
+
+    `metadata`, `info.teams` and the scalar fields of `info` are kept as usual.
+    With orjson installed the body is decoded in full (it's the fastest by far) and pruned right away.
+    Otherwise, with ijson installed, the body is parsed incrementally: one participant is built at a time
+    and thrown away unless it's the one we want, so the other nine never pile up in memory.
+    Without either, the standard library decodes it in full and it's pruned afterwards.
+
+    Args:
+        raw (bytes): The raw JSON of the match.
+        puuid (str): The PUUID of the participant to keep.
+
+    Returns:
+        MatchData: The match, with `info.participants` holding at most one participant.
+    """
+    if ijson is not None and orjson is None:
+        return _stream_match_for(raw, puuid)
+
+    data = decode_json(raw)
+    info = data.get("info", {})
+    info["participants"] = [p for p in info.get("participants", []) if p.get("puuid") == puuid]
+    return data
+
+
+def _stream_match_for(raw: bytes, puuid: str) -> MatchData:
+    result: dict = {"info": {"participants": []}}
+    info = result["info"]
+
+    builder: Optional[Any] = None
+    root = ""   # prefix of the subtree that `builder` is building
+
+    for prefix, event, value in ijson.parse(io.BytesIO(raw), use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == root and event in ("end_map", "end_array"):
+                kept = builder.value
+                builder = None
+
+                if root == _PARTICIPANT:
+                    if kept.get("puuid") == puuid:
+                        info["participants"].append(kept)
+                else:
+                    _assign(result, root, kept)
+            continue
+
+        if event in ("start_map", "start_array") and (prefix in _KEPT_SUBTREES or prefix == _PARTICIPANT):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            root = prefix
+            continue
+
+        # Scalars directly under "info" (gameId, queueId, gameEndTimestamp, ...)
+        if event in _SCALAR_EVENTS and prefix.startswith("info.") and prefix.count(".") == 1:
+            info[prefix[5:]] = value
+
+    return result
+
+
+def _assign(result: dict, path: str, value: Any):
+    *parents, key = path.split(".")
+    target = result
+    for parent in parents:
+        target = target.setdefault(parent, {})
+    target[key] = value
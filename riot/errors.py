@@ -0,0 +1,27 @@
+# ========== Imports ==========
+from typing import Optional
+
+
+# ========== Errors ==========
+class RiotAPIError(Exception):
+    """Base class for every failed Riot API request. `status` is None when no response came back."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+class NotFound(RiotAPIError):
+    """404: the player/match doesn't exist (yet). Retrying won't help."""
+
+class RateLimited(RiotAPIError):
+    """429 that persisted through every retry."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, 429)
+        self.retry_after = retry_after
+
+class UpstreamError(RiotAPIError):
+    """5xx or connection error that persisted through every retry."""
+
+class RequestTimeout(RiotAPIError):
+    """Riot didn't answer in time, on every retry."""
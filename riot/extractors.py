@@ -1,5 +1,6 @@
 # ========== Imports ==========
-from typing import Optional, List
+from functools import cached_property
+from typing import Optional, List, Dict
 from riot.riot_types import *
 
 
@@ -55,4 +56,111 @@ def get_bans_data(data: TeamData) -> Optional[list[BanData]]:
 
 def get_objectives_data(data: TeamData) -> Optional[ObjectivesData]:
     """Returns ObjectivesData from TeamData. Returns None if missing."""
-    return data.get('objectives')
\ No newline at end of file
+    return data.get('objectives')
+
+
+# ========== Class MatchExtractor ==========
+class MatchExtractor:
+    """
+    Wraps a MatchData and answers lookups without rescanning the participant list.
+
+    The indexes and team totals are built lazily on first use and memoized, so building recaps for
+    several tracked players of the same match only pays for them once.
+
+    *Functions*:
+        `participant()`: gets the ParticipantData of a PUUID.
+        `participant_by_id()`: gets the ParticipantData of a participantId.
+        `team()`: gets the TeamData of a teamId.
+        `team_of()`: gets the TeamData of the team a PUUID played on.
+        `kill_participation()`: (kills + assists) / team kills of a PUUID.
+        `damage_share()`: damage to champions / team damage to champions of a PUUID.
+    """
+
+    def __init__(self, data: MatchData):
+        self.data = data
+
+    @cached_property
+    def info(self) -> MatchInfo:
+        return get_match_info(self.data) or {}
+
+    @cached_property
+    def participants(self) -> List[ParticipantData]:
+        return get_participants(self.info) or []
+
+    @cached_property
+    def teams(self) -> List[TeamData]:
+        return get_team_data(self.info) or []
+
+    # INDEXES:
+    @cached_property
+    def by_puuid(self) -> Dict[str, ParticipantData]:
+        return {p["puuid"]: p for p in self.participants if "puuid" in p}
+
+    @cached_property
+    def by_participant_id(self) -> Dict[int, ParticipantData]:
+        return {p["participantId"]: p for p in self.participants if "participantId" in p}
+
+    @cached_property
+    def by_team_id(self) -> Dict[int, TeamData]:
+        return {t["teamId"]: t for t in self.teams if "teamId" in t}
+
+    # DERIVED VALUES (per team):
+    def _team_sum(self, field: str) -> Dict[int, int]:
+        totals: Dict[int, int] = {}
+        for p in self.participants:
+            team_id = p.get("teamId", 0)
+            totals[team_id] = totals.get(team_id, 0) + p.get(field, 0)
+        return totals
+
+    @cached_property
+    def team_kills(self) -> Dict[int, int]:
+        """teamId -> kills, the kill participation denominator."""
+        return self._team_sum("kills")
+
+    @cached_property
+    def team_damage(self) -> Dict[int, int]:
+        """teamId -> total damage dealt to champions."""
+        return self._team_sum("totalDamageDealtToChampions")
+
+    @cached_property
+    def team_gold(self) -> Dict[int, int]:
+        """teamId -> gold earned."""
+        return self._team_sum("goldEarned")
+
+    # LOOKUPS:
+    def participant(self, puuid: str) -> Optional[ParticipantData]:
+        return self.by_puuid.get(puuid)
+
+    def participant_by_id(self, participant_id: int) -> Optional[ParticipantData]:
+        return self.by_participant_id.get(participant_id)
+
+    def team(self, team_id: int) -> Optional[TeamData]:
+        return self.by_team_id.get(team_id)
+
+    def team_of(self, puuid: str) -> Optional[TeamData]:
+        participant = self.participant(puuid)
+        if participant is None:
+            return None
+        return self.team(participant.get("teamId", 0))
+
+    def kill_participation(self, puuid: str) -> Optional[float]:
+        """Returns (kills + assists) / team kills, or None if the PUUID didn't play this match."""
+        participant = self.participant(puuid)
+        if participant is None:
+            return None
+
+        team_kills = self.team_kills.get(participant.get("teamId", 0), 0)
+        if team_kills == 0:
+            return 0.0
+        return (participant.get("kills", 0) + participant.get("assists", 0)) / team_kills
+
+    def damage_share(self, puuid: str) -> Optional[float]:
+        """Returns damage to champions / team damage to champions, or None if the PUUID didn't play this match."""
+        participant = self.participant(puuid)
+        if participant is None:
+            return None
+
+        team_damage = self.team_damage.get(participant.get("teamId", 0), 0)
+        if team_damage == 0:
+            return 0.0
+        return participant.get("totalDamageDealtToChampions", 0) / team_damage
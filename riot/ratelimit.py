@@ -0,0 +1,180 @@
+# ========== Imports ==========
+import time
+import asyncio
+
+from collections import deque
+from typing import Mapping, Optional
+
+
+# ========== Constants ==========
+# Limits of a personal/development key, used until Riot tells us the real ones.
+DEFAULT_APP_LIMITS = "20:1,100:120"
+
+# Small safety margin (seconds) so we never land exactly on a window edge.
+_MARGIN = 0.05
+
+
+# ========== Helpers ==========
+def parse_limits(header: Optional[str]) -> list[tuple[int, int]]:
+    """Parses a Riot rate-limit header like "20:1,100:120" into [(20, 1), (100, 120)].
+    Returns an empty list if the header is missing or malformed."""
+    if not header:
+        return []
+
+    limits = []
+    for part in header.split(","):
+        try:
+            count, seconds = part.strip().split(":")
+            limits.append((int(count), int(seconds)))
+        except ValueError:
+            continue
+    return limits
+
+
+# ========== Classes ==========
+class _Window:
+    """One "count:seconds" limit. Keeps the timestamps of the requests made within the window."""
+
+    __slots__ = ("limit", "seconds", "sent")
+
+    def __init__(self, limit: int, seconds: int):
+        self.limit = limit
+        self.seconds = seconds
+        self.sent: deque[float] = deque()
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one more request fits in this window (0 if it fits right now)."""
+        while self.sent and now - self.sent[0] >= self.seconds + _MARGIN:
+            self.sent.popleft()
+
+        if len(self.sent) < self.limit:
+            return 0.0
+        return self.sent[0] + self.seconds + _MARGIN - now
+
+
+class Bucket:
+    """
+    A set of rate-limit windows that all have to allow a request before it is sent.
+
+    Riot enforces fixed windows that start with the first request, so a window is tracked as a
+    sliding log of send times: it never lets more than `limit` requests through in any `seconds` span.
+    """
+
+    def __init__(self, limits: list[tuple[int, int]]):
+        self.windows = [_Window(count, seconds) for count, seconds in limits]
+        self.blocked_until = 0.0
+
+    def wait_time(self, now: float) -> float:
+        wait = self.blocked_until - now
+        for window in self.windows:
+            wait = max(wait, window.wait_time(now))
+        return max(wait, 0.0)
+
+    def record(self, now: float):
+        for window in self.windows:
+            window.sent.append(now)
+
+    def update_limits(self, limits: list[tuple[int, int]], counts: list[tuple[int, int]]):
+        """Replaces the windows if Riot reports different limits, and pads our local log
+        when Riot has counted more requests than we have (e.g. right after a restart)."""
+        if limits and limits != [(w.limit, w.seconds) for w in self.windows]:
+            old = {w.seconds: w.sent for w in self.windows}
+            self.windows = [_Window(count, seconds) for count, seconds in limits]
+            for window in self.windows:
+                window.sent = old.get(window.seconds, deque())
+
+        now = time.monotonic()
+        server_counts = {seconds: count for count, seconds in counts}
+        for window in self.windows:
+            missing = server_counts.get(window.seconds, 0) - len(window.sent)
+            # The log stays oldest-first: the unknown requests count as old as our oldest one (now if none)
+            oldest = window.sent[0] if window.sent else now
+            for _ in range(missing):
+                window.sent.appendleft(oldest)
+
+
+class RateLimiter:
+    """
+    Shared async rate limiter for the Riot API.
+
+    Every request first waits on the application bucket of its routing host and on the method bucket
+    of its endpoint. Limits are learned from the `X-App-Rate-Limit` / `X-Method-Rate-Limit` headers
+    and a 429's `Retry-After` blocks the bucket that was hit.
+
+    *Functions*:
+        `acquire()`: waits until a request to (host, method) is allowed.
+        `update()`: feeds the response headers back into the limiter.
+    """
+
+    def __init__(self, app_limits: str = DEFAULT_APP_LIMITS):
+        self._default_app_limits = parse_limits(app_limits)
+        self._app: dict[str, Bucket] = {}
+        self._methods: dict[tuple[str, str], Bucket] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+    def _app_bucket(self, host: str) -> Bucket:
+        bucket = self._app.get(host)
+        if bucket is None:
+            bucket = self._app[host] = Bucket(self._default_app_limits)
+        return bucket
+
+    def _method_bucket(self, host: str, method: str) -> Bucket:
+        bucket = self._methods.get((host, method))
+        if bucket is None:
+            # Unknown until the first response tells us
+            bucket = self._methods[(host, method)] = Bucket([])
+        return bucket
+
+    async def acquire(self, host: str, method: str):
+        """Waits (in FIFO order per endpoint) until a request to `method` on `host` may be sent.
+
+        Args:
+            host (str): The routing host, e.g. a value from `REGIONS`.
+            method (str): A name for the endpoint, e.g. "match-v5.matches".
+        """
+        key = (host, method)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+
+        app, meth = self._app_bucket(host), self._method_bucket(host, method)
+        async with lock:
+            while True:
+                now = time.monotonic()
+                wait = max(app.wait_time(now), meth.wait_time(now))
+                if wait <= 0:
+                    app.record(now)
+                    meth.record(now)
+                    return
+                await asyncio.sleep(wait)
+
+    def update(self, host: str, method: str, status: int, headers: Mapping[str, str]):
+        """Learns the limits from a response and honors `Retry-After` on a 429.
+
+        Args:
+            host (str): The routing host the request was sent to.
+            method (str): The endpoint name used in `acquire()`.
+            status (int): The HTTP status of the response.
+            headers (Mapping[str, str]): The response headers.
+        """
+        app, meth = self._app_bucket(host), self._method_bucket(host, method)
+        app.update_limits(
+            parse_limits(headers.get("X-App-Rate-Limit")),
+            parse_limits(headers.get("X-App-Rate-Limit-Count")),
+        )
+        meth.update_limits(
+            parse_limits(headers.get("X-Method-Rate-Limit")),
+            parse_limits(headers.get("X-Method-Rate-Limit-Count")),
+        )
+
+        if status != 429:
+            return
+
+        try:
+            retry_after = float(headers.get("Retry-After", 1))
+        except ValueError:
+            retry_after = 1.0
+
+        # "application" blocks the whole host, "method" and "service" only this endpoint
+        bucket = app if headers.get("X-Rate-Limit-Type") == "application" else meth
+        bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + retry_after)
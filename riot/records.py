@@ -0,0 +1,159 @@
+"""
+records.py
+
+==========
+
+Compact projections of the Match-V5 payload (see riot_types.py).
+
+A raw `MatchData` holds ~10 participants x ~150 fields plus a big `ChallengesData` dict each.
+The records below keep only what recaps and stats use, in `__slots__` classes and `array`s,
+so a match kept in memory costs a fraction of the raw dicts. Use `to_match_record()` to convert.
+"""
+
+# ========== Imports ==========
+from array import array
+from typing import Optional
+
+from riot.riot_types import MatchData, ParticipantData, TeamData
+
+
+# ========== Participant ==========
+class ParticipantRecord:
+    """The stats of one participant that recaps and stats commands use."""
+
+    __slots__ = (
+        "puuid", "participant_id", "team_id", "riot_id", "champion_id", "champion_name",
+        "position", "champ_level", "win",
+        "kills", "deaths", "assists", "cs", "gold_earned",
+        "damage_to_champions", "damage_taken", "vision_score", "wards_placed", "wards_killed",
+        "items", "summoner_spells", "primary_style", "sub_style", "perks", "stat_perks",
+    )
+
+    def __init__(self, data: ParticipantData):
+        self.puuid: str = data.get("puuid", "")
+        self.participant_id: int = data.get("participantId", 0)
+        self.team_id: int = data.get("teamId", 0)
+        self.riot_id: str = f"{data.get('riotIdGameName', '')}#{data.get('riotIdTagline', '')}"
+        self.champion_id: int = data.get("championId", 0)
+        self.champion_name: str = data.get("championName", "")
+        self.position: str = data.get("teamPosition") or data.get("individualPosition", "")
+        self.champ_level: int = data.get("champLevel", 0)
+        self.win: bool = data.get("win", False)
+
+        self.kills: int = data.get("kills", 0)
+        self.deaths: int = data.get("deaths", 0)
+        self.assists: int = data.get("assists", 0)
+        self.cs: int = data.get("totalMinionsKilled", 0) + data.get("neutralMinionsKilled", 0)
+        self.gold_earned: int = data.get("goldEarned", 0)
+
+        self.damage_to_champions: int = data.get("totalDamageDealtToChampions", 0)
+        self.damage_taken: int = data.get("totalDamageTaken", 0)
+        self.vision_score: int = data.get("visionScore", 0)
+        self.wards_placed: int = data.get("wardsPlaced", 0)
+        self.wards_killed: int = data.get("wardsKilled", 0)
+
+        # item0 - item6 (item6 is the trinket), 0 means an empty slot
+        self.items = array("i", (data.get(f"item{i}", 0) for i in range(7)))
+        self.summoner_spells = array("i", (data.get("summoner1Id", 0), data.get("summoner2Id", 0)))
+
+        # Runes: primary/secondary tree, every selected perk in order, and the three stat shards
+        perks = data.get("perks")
+        styles = perks.get("styles", []) if perks else []
+        self.primary_style: int = styles[0].get("style", 0) if len(styles) > 0 else 0
+        self.sub_style: int = styles[1].get("style", 0) if len(styles) > 1 else 0
+        self.perks = array("i", (sel.get("perk", 0) for style in styles for sel in style.get("selections", [])))
+
+        stat_perks = perks.get("statPerks") if perks else None
+        self.stat_perks = array("i", (
+            (stat_perks.get("offense", 0), stat_perks.get("flex", 0), stat_perks.get("defense", 0))
+            if stat_perks else ()
+        ))
+
+    @property
+    def kda(self) -> float:
+        return (self.kills + self.assists) / max(self.deaths, 1)
+
+
+# ========== Team ==========
+class TeamRecord:
+    """The result, bans and objectives of one team."""
+
+    __slots__ = (
+        "team_id", "win", "bans",
+        "champion_kills", "towers", "inhibitors", "dragons", "barons", "heralds", "hordes",
+        "first_blood", "first_tower",
+    )
+
+    def __init__(self, data: TeamData):
+        self.team_id: int = data.get("teamId", 0)
+        self.win: bool = data.get("win", False)
+        self.bans = array("i", (ban.get("championId", -1) for ban in data.get("bans", [])))
+
+        objectives: dict = dict(data.get("objectives") or {})
+
+        def kills(name: str) -> int:
+            return objectives.get(name, {}).get("kills", 0)
+
+        self.champion_kills = kills("champion")
+        self.towers = kills("tower")
+        self.inhibitors = kills("inhibitor")
+        self.dragons = kills("dragon")
+        self.barons = kills("baron")
+        self.heralds = kills("riftHerald")
+        self.hordes = kills("horde")
+        self.first_blood: bool = objectives.get("champion", {}).get("first", False)
+        self.first_tower: bool = objectives.get("tower", {}).get("first", False)
+
+
+# ========== Match ==========
+class MatchRecord:
+    """
+    The parts of a match that recaps and stats use.
+
+    Participants and teams are indexed once when the record is built, like `MatchExtractor` does for
+    raw MatchData, so a recap of several tracked players of the match never rescans them.
+
+    *Functions*:
+        `participant()`: gets the ParticipantRecord of a PUUID.
+        `team()`: gets the TeamRecord of a team ID.
+    """
+
+    __slots__ = (
+        "match_id", "game_id", "platform_id", "queue_id", "game_mode", "game_version",
+        "duration", "start_timestamp", "end_timestamp", "teams", "participants",
+        "top_damage", "_by_puuid", "_teams_by_id",
+    )
+
+    def __init__(self, data: MatchData):
+        metadata: dict = dict(data.get("metadata") or {})
+        info: dict = dict(data.get("info") or {})
+
+        self.match_id: str = metadata.get("matchId", "")
+        self.game_id: int = info.get("gameId", 0)
+        self.platform_id: str = info.get("platformId", "")
+        self.queue_id: int = info.get("queueId", 0)
+        self.game_mode: str = info.get("gameMode", "")
+        self.game_version: str = info.get("gameVersion", "")
+        self.duration: int = info.get("gameDuration", 0)
+        self.start_timestamp: int = info.get("gameStartTimestamp", 0)
+        self.end_timestamp: int = info.get("gameEndTimestamp", 0)
+
+        self.teams = tuple(TeamRecord(team) for team in info.get("teams", []))
+        self.participants = tuple(ParticipantRecord(p) for p in info.get("participants", []))
+
+        # Highest damage to champions of the match, the scale of every recap card's damage bar
+        self.top_damage: int = max((p.damage_to_champions for p in self.participants), default=0)
+        self._by_puuid = {participant.puuid: participant for participant in self.participants}
+        self._teams_by_id = {team.team_id: team for team in self.teams}
+
+    def participant(self, puuid: str) -> Optional[ParticipantRecord]:
+        return self._by_puuid.get(puuid)
+
+    def team(self, team_id: int) -> Optional[TeamRecord]:
+        return self._teams_by_id.get(team_id)
+
+
+# ========== Functions ==========
+def to_match_record(data: MatchData) -> MatchRecord:
+    """Converts a raw MatchData into a compact MatchRecord. The raw dict can be dropped afterwards."""
+    return MatchRecord(data)
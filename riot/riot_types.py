@@ -446,4 +446,52 @@ class MatchMetadata(TypedDict):
 # THIS IS THE JSON RESPONSE
 class MatchData(TypedDict):
     metadata: MatchMetadata
-    info: MatchInfo
\ No newline at end of file
+    info: MatchInfo
+
+# ========== League Wrappers ==========
+# (https://developer.riotgames.com/apis#league-v4/GET_getLeagueEntriesByPUUID)
+
+class MiniSeriesData(TypedDict):
+    losses: int
+    progress: str
+    target: int
+    wins: int
+
+class LeagueEntryData(TypedDict, total=False):
+    leagueId: str
+    puuid: str
+    queueType: str          # RANKED_SOLO_5x5, RANKED_FLEX_SR, ...
+    tier: str               # IRON ... CHALLENGER
+    rank: str               # division, I-IV
+    leaguePoints: int
+    wins: int
+    losses: int
+    hotStreak: bool
+    veteran: bool
+    freshBlood: bool
+    inactive: bool
+    miniSeries: MiniSeriesData
+
+
+# ========== Spectator Wrappers ==========
+# (https://developer.riotgames.com/apis#spectator-v5/GET_getCurrentGameInfoByPuuid)
+
+class CurrentGameParticipantData(TypedDict, total=False):
+    puuid: str
+    championId: int
+    teamId: int
+    spell1Id: int
+    spell2Id: int
+    riotId: str
+    bot: bool
+
+class CurrentGameInfo(TypedDict, total=False):
+    gameId: int
+    gameType: str
+    gameStartTime: int          # epoch milliseconds, 0 while the game is still loading
+    mapId: int
+    gameLength: int             # seconds since the start, as of the response
+    platformId: str             # e.g. EUW1, the prefix of the match ID once the game is over
+    gameMode: str
+    gameQueueConfigId: int
+    participants: List[CurrentGameParticipantData]
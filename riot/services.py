@@ -1,10 +1,17 @@
 # ========== Imports ==========
-import aiohttp
+import asyncio
 
-from riot.api import get_puuid, get_match_id, REGIONS
+from riot.api import get_puuid, get_match_ids, REGIONS
+from riot.client import RiotHTTPClient
+from riot.cache import PuuidCache
+from riot.errors import NotFound
 from typing import Optional, Tuple
 
 
+# ========== Caches ==========
+puuid_cache = PuuidCache()
+
+
 # ========== Functions ==========
 def split_riot_name(riot_name: str) -> Optional[Tuple[str, str]]:
     """Returns a tuple with the username and the tag. Returns None if username is invalid."""
@@ -21,25 +28,55 @@ def validate_region(region: str) -> bool:
     return True if region in REGIONS else False
 
 
-async def get_puuid_and_match_id(
+async def resolve_puuid(
+        game_name: str,
+        tag: str,
+        region: str,
+        session: RiotHTTPClient
+) -> Optional[str]:
+    """Returns the PUUID of a Riot ID, using the cache before asking Riot. Returns None if it doesn't exist.
+    Other Riot API errors are raised."""
+    host = REGIONS[region]
+
+    cached = await asyncio.to_thread(puuid_cache.get, game_name, tag, host)
+    if cached is not None:
+        # An empty string is a remembered 404
+        return cached or None
+
+    try:
+        puuid = await get_puuid(game_name, tag, region, session)
+    except NotFound:
+        puuid_cache.put_not_found(game_name, tag, host)
+        return None
+
+    if puuid:
+        await asyncio.to_thread(puuid_cache.put, game_name, tag, host, puuid)
+    return puuid
+
+
+async def get_puuid_and_match_ids(
         riot_name: str, 
         region: str,
-        session: aiohttp.ClientSession
-) -> Tuple[Optional[str], Optional[str]]:
-    """Returns a tuple with the puuid and the match_id. Returns None if either of them fail."""
+        session: RiotHTTPClient,
+        count: int = 10
+) -> Tuple[Optional[str], list[str]]:
+    """Returns a tuple with the puuid and the `count` most recent match IDs (newest first).
+    Returns (None, []) if the player doesn't exist or has no matches.
+    Other Riot API errors (rate limits, outages, timeouts) are raised."""
     parsed = split_riot_name(riot_name)
     if not parsed:
-        return None, None
+        return None, []
 
     game_name, tag = parsed
     region = region.upper()
 
-    puuid = await get_puuid(game_name, tag, region, session)
+    puuid = await resolve_puuid(game_name, tag, region, session)
     if not puuid:
-        return None, None
+        return None, []
 
-    match_id = await get_match_id(puuid, region, session)
-    if not match_id:
-        return None, None
+    # The whole history in one request instead of one per match
+    match_ids = await get_match_ids(puuid, region, session, count=count)
+    if not match_ids:
+        return None, []
 
-    return puuid, match_id
\ No newline at end of file
+    return puuid, match_ids
\ No newline at end of file
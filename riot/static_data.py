@@ -0,0 +1,296 @@
+"""
+static_data.py
+
+==========
+
+Data Dragon (https://developer.riotgames.com/docs/lol#data-dragon) static data: champion, item, rune and
+summoner spell names and icons, resolved from the numeric IDs found in Match-V5 data.
+
+Every patch lives in its own directory of the on-disk cache, laid out like Data Dragon itself:
+
+    <DDRAGON_DIR>/<version>/data/<locale>/champion.json, item.json, summoner.json, runesReforged.json
+    <DDRAGON_DIR>/<version>/img/champion/, img/item/, img/spell/, img/perk-images/
+    <DDRAGON_DIR>/current       (the version in use)
+
+A version is filled once, from an extracted Data Dragon archive or with `download()`
+(`python -m riot.static_data [version]`), and never touches the network afterwards.
+A running bot notices when `current` changes and switches to that version on its next lookup.
+"""
+
+# ========== Imports ==========
+import os
+import sys
+import json
+import shutil
+import asyncio
+import aiohttp
+import threading
+
+from typing import NamedTuple, Optional
+
+
+# ========== Constants ==========
+DDRAGON_DIR = os.getenv("DDRAGON_DIR", "assets/ddragon")
+DDRAGON_LOCALE = os.getenv("DDRAGON_LOCALE", "en_US")
+
+DDRAGON_URL = "https://ddragon.leagueoflegends.com"
+
+# Name of the file holding the version in use, inside DDRAGON_DIR
+CURRENT_FILE = "current"
+
+# Icons downloaded at once by `download()`
+DOWNLOAD_CONCURRENCY = 16
+
+_DATA_FILES = ("champion.json", "item.json", "summoner.json", "runesReforged.json")
+
+
+# ========== Types ==========
+class Entry(NamedTuple):
+    name: str
+    icon: str       # path relative to the version directory, "" if there is none
+
+
+# ========== Class StaticData ==========
+class StaticData:
+    """
+    The lookup tables of one Data Dragon version, built once from its JSON files.
+
+    Instances never change: a new patch is a new instance, swapped in with `set_static_data()`,
+    so a render that holds one keeps consistent names and icons even if the patch changes meanwhile.
+
+    *Functions*:
+        `champion()`: a champion by ID (`championId`).
+        `champion_by_name()`: a champion by name as in `championName` (e.g. "MonkeyKing").
+        `item()`: an item by ID (`item0`-`item6`).
+        `rune()`: a rune or rune tree by ID (perk IDs and `style`).
+        `summoner_spell()`: a summoner spell by ID (`summoner1Id`/`summoner2Id`).
+        `icon_path()`: the full path of an entry's icon, None if it isn't on disk.
+    """
+
+    def __init__(self, directory: str, locale: str = DDRAGON_LOCALE):
+        self.directory = directory
+        self.version = os.path.basename(os.path.normpath(directory))
+        self.locale = locale
+
+        self.champions: dict[int, Entry] = {}
+        self.champions_by_name: dict[str, Entry] = {}
+        self.items: dict[int, Entry] = {}
+        self.runes: dict[int, Entry] = {}
+        self.summoner_spells: dict[int, Entry] = {}
+        self._load()
+
+    def _read(self, name: str) -> Optional[object]:
+        # Data Dragon archives keep a folder per locale; a flat data/ folder works too
+        for path in (
+            os.path.join(self.directory, "data", self.locale, name),
+            os.path.join(self.directory, "data", name),
+            os.path.join(self.directory, name),
+        ):
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        return None
+
+    def _load(self):
+        champions = self._read("champion.json") or {}
+        for key, champion in champions.get("data", {}).items():
+            entry = Entry(champion.get("name", key), f"img/champion/{champion['image']['full']}")
+            self.champions[int(champion["key"])] = entry
+            self.champions_by_name[champion.get("id", key)] = entry
+
+        items = self._read("item.json") or {}
+        for item_id, item in items.get("data", {}).items():
+            self.items[int(item_id)] = Entry(item.get("name", item_id), f"img/item/{item['image']['full']}")
+
+        spells = self._read("summoner.json") or {}
+        for key, spell in spells.get("data", {}).items():
+            self.summoner_spells[int(spell["key"])] = Entry(spell.get("name", key), f"img/spell/{spell['image']['full']}")
+
+        for tree in self._read("runesReforged.json") or []:
+            self.runes[tree["id"]] = Entry(tree.get("name", ""), f"img/{tree['icon']}")
+            for slot in tree.get("slots", []):
+                for rune in slot.get("runes", []):
+                    self.runes[rune["id"]] = Entry(rune.get("name", ""), f"img/{rune['icon']}")
+
+    def champion(self, champion_id: int) -> Optional[Entry]:
+        return self.champions.get(champion_id)
+
+    def champion_by_name(self, name: str) -> Optional[Entry]:
+        return self.champions_by_name.get(name)
+
+    def item(self, item_id: int) -> Optional[Entry]:
+        return self.items.get(item_id)
+
+    def rune(self, rune_id: int) -> Optional[Entry]:
+        return self.runes.get(rune_id)
+
+    def summoner_spell(self, spell_id: int) -> Optional[Entry]:
+        return self.summoner_spells.get(spell_id)
+
+    def icon_path(self, entry: Optional[Entry]) -> Optional[str]:
+        if entry is None or not entry.icon:
+            return None
+        path = os.path.join(self.directory, entry.icon)
+        return path if os.path.exists(path) else None
+
+
+# ========== Current version ==========
+_current: Optional[StaticData] = None
+_current_lock = threading.Lock()
+# Modification time of the `current` file the loaded version was picked from (None if there was none)
+_pointer_mtime: Optional[float] = None
+
+
+def _read_pointer_mtime(root: str) -> Optional[float]:
+    try:
+        return os.stat(os.path.join(root, CURRENT_FILE)).st_mtime
+    except OSError:
+        return None
+
+
+def _current_version(root: str) -> Optional[str]:
+    path = os.path.join(root, CURRENT_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            version = f.read().strip()
+        if version and os.path.isdir(os.path.join(root, version)):
+            return version
+
+    # No pointer yet: the newest version directory, if any (not an unfinished download)
+    versions = [
+        name for name in os.listdir(root)
+        if name[:1].isdigit() and not name.endswith(".tmp") and os.path.isdir(os.path.join(root, name))
+    ]
+    if versions:
+        return max(versions, key=lambda v: tuple(int(part) for part in v.split(".") if part.isdigit()))
+    return None
+
+
+def get_static_data(root: str = DDRAGON_DIR) -> StaticData:
+    """The static data in use, loaded on first call. Empty tables if nothing was downloaded yet.
+
+    When the `current` file changed since (e.g. `python -m riot.static_data` ran next to the bot),
+    the version it names is loaded and swapped in; if that fails, the loaded version stays in use.
+    """
+    global _current, _pointer_mtime
+    # One stat per lookup: a patch switch is seen by the next recap, without a restart
+    mtime = _read_pointer_mtime(root)
+    if _current is not None and mtime == _pointer_mtime:
+        return _current
+
+    with _current_lock:
+        if _current is not None and mtime == _pointer_mtime:
+            return _current
+
+        version = _current_version(root) if os.path.isdir(root) else None
+        if _current is None:
+            # Without any version, `root` itself is read (e.g. an older flat copy of Data Dragon)
+            _current = StaticData(os.path.join(root, version) if version else root)
+        elif version and version != _current.version:
+            try:
+                _current = StaticData(os.path.join(root, version))
+                print(f"Switched to Data Dragon {version}")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Loading Data Dragon {version} failed, keeping {_current.version}: {e}")
+        _pointer_mtime = mtime
+        return _current
+
+
+def set_static_data(version: str, root: str = DDRAGON_DIR) -> StaticData:
+    """Loads a downloaded version and swaps it in as the current one (also for the next restarts).
+
+    The new tables are built completely before the swap, which is a single reference assignment,
+    so readers see either the old patch or the new one, never a mix.
+    """
+    global _current, _pointer_mtime
+    static_data = StaticData(os.path.join(root, version))
+
+    pointer = os.path.join(root, CURRENT_FILE)
+    with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+
+    with _current_lock:
+        _current = static_data
+        _pointer_mtime = _read_pointer_mtime(root)
+    return static_data
+
+
+# ========== Download ==========
+async def _fetch(session: aiohttp.ClientSession, url: str) -> bytes:
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.read()
+
+
+async def latest_version(session: aiohttp.ClientSession) -> str:
+    return json.loads(await _fetch(session, f"{DDRAGON_URL}/api/versions.json"))[0]
+
+
+async def download(
+        version: Optional[str] = None,
+        root: str = DDRAGON_DIR,
+        locale: str = DDRAGON_LOCALE) -> str:
+    """Downloads one Data Dragon version (data files and icons) into the cache, once.
+
+    Files go to a temporary directory that is renamed into place at the end, so an interrupted
+    download never leaves a half-filled version behind.
+
+    Args:
+        version (str, optional): e.g. "14.20.1", the latest one by default.
+        root (str): The cache directory.
+        locale (str): Locale of the names.
+
+    Raises:
+        aiohttp.ClientError: Data Dragon couldn't be reached (nothing is written then).
+
+    Returns:
+        str: The downloaded (or already cached) version.
+    """
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60)) as session:
+        version = version or await latest_version(session)
+        target = os.path.join(root, version)
+        if os.path.isdir(target):
+            return version
+
+        staging = target + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(os.path.join(staging, "data", locale))
+
+        for name in _DATA_FILES:
+            raw = await _fetch(session, f"{DDRAGON_URL}/cdn/{version}/data/{locale}/{name}")
+            with open(os.path.join(staging, "data", locale, name), "wb") as f:
+                f.write(raw)
+
+        # Rune icons aren't versioned on the CDN, the others are
+        tables = StaticData(staging, locale)
+        icons = {entry.icon for table in (tables.champions, tables.items, tables.summoner_spells) for entry in table.values()}
+        urls = {icon: f"{DDRAGON_URL}/cdn/{version}/{icon}" for icon in icons}
+        urls.update({entry.icon: f"{DDRAGON_URL}/cdn/{entry.icon}" for entry in tables.runes.values()})
+
+        semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+
+        async def fetch_icon(icon: str, url: str):
+            async with semaphore:
+                try:
+                    raw = await _fetch(session, url)
+                except aiohttp.ClientResponseError as e:
+                    # A missing icon only means a placeholder on the cards
+                    print(f"Skipping icon {icon}: {e.status}")
+                    return
+            path = os.path.join(staging, icon)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(raw)
+
+        await asyncio.gather(*(fetch_icon(icon, url) for icon, url in urls.items()))
+        os.replace(staging, target)
+
+    print(f"Downloaded Data Dragon {version} ({len(urls)} icons) to {target}")
+    return version
+
+
+if __name__ == "__main__":
+    downloaded = asyncio.run(download(sys.argv[1] if len(sys.argv) > 1 else None))
+    set_static_data(downloaded)
+    print(f"Now using Data Dragon {downloaded}")
@@ -0,0 +1,143 @@
+import os
+import time
+import asyncio
+
+os.environ.setdefault("RIOT_TOKEN", "test")
+
+from types import SimpleNamespace
+
+from tracking import poller
+from tracking.index import Player
+from tracking.poller import POLL_MIN_INTERVAL, MatchPoller, next_interval
+
+
+def test_detection_resets_interval(monkeypatch):
+    now = time.time()
+    match = {"metadata": {"participants": ["puuid"]}, "info": {"queueId": 400, "gameEndTimestamp": (now - 7200) * 1000}}
+
+    async def get_match_ids(puuid, region, session, count):
+        return ["EUW1_2", "EUW1_1"]
+
+    async def iter_match_data(match_ids, region, session):
+        for match_id in match_ids:
+            yield match_id, match
+
+    monkeypatch.setattr(poller, "get_match_ids", get_match_ids)
+    monkeypatch.setattr(poller, "iter_match_data", iter_match_data)
+
+    user = SimpleNamespace(add_matches=lambda match_ids: list(match_ids), ranked={})
+    guild = SimpleNamespace(get_member=lambda discord_id: user)
+    track = SimpleNamespace(get_guild=lambda guild_id: guild, save=lambda: None)
+
+    events = []
+    async def on_new_match(event):
+        events.append(event)
+
+    player = Player("puuid", "EUW", ["EUW1_1"])
+    player.subscribers.add(("1", "2"))
+    found = asyncio.run(MatchPoller(track, None, on_new_match)._check(player))
+
+    assert found is True
+    assert [event.match_id for event in events] == ["EUW1_2"]
+    assert next_interval(player, 3600, found, now) == POLL_MIN_INTERVAL
+
+
+def test_spectator_fetches_match_after_short_game(monkeypatch):
+    games = [{"platformId": "EUW1", "gameId": 3}, {"platformId": "EUW1", "gameId": 3}, None]
+    fetched = []
+
+    async def get_active_game(puuid, region, session):
+        return games.pop(0)
+
+    async def get_match_data(match_id, region, session):
+        fetched.append(match_id)
+        if len(fetched) == 1:
+            raise poller.NotFound("not out yet", 404)
+
+    monkeypatch.setattr(poller, "get_active_game", get_active_game)
+    monkeypatch.setattr(poller, "get_match_data", get_match_data)
+
+    match_poller = MatchPoller(SimpleNamespace(), None, None, spectator=True)
+    async def check(player):
+        return True
+    monkeypatch.setattr(match_poller, "_check", check)
+
+    player = Player("puuid", "EUW", ["EUW1_1"])
+    steps = [asyncio.run(match_poller._spectate(player)) for _ in range(4)]
+
+    # In progress twice, gone (match not out yet), then the match is fetched and announced
+    assert steps == [
+        (False, poller.LIVE_CHECK_INTERVAL),
+        (False, poller.LIVE_CHECK_INTERVAL),
+        (False, poller.MATCH_FETCH_RETRY),
+        (True, None),
+    ]
+    assert fetched == ["EUW1_3", "EUW1_3"]
+
+
+def test_failed_activity_load_keeps_player_scheduled(monkeypatch):
+    def broken_get(match_id):
+        raise OSError("disk I/O error")
+
+    monkeypatch.setattr(poller.match_cache, "get", broken_get)
+
+    match_poller = MatchPoller(SimpleNamespace(), None, None)
+    checked = []
+    async def check(player):
+        checked.append(player.puuid)
+        return False
+    monkeypatch.setattr(match_poller, "_check", check)
+
+    player = Player("p1", "EUW", ["EUW1_1"])
+    match_poller._intervals[player.puuid] = match_poller.interval
+    asyncio.run(match_poller._check_scheduled(player, asyncio.Semaphore(1)))
+
+    assert checked == ["p1"]
+    assert [puuid for _, puuid in match_poller._schedule] == ["p1"]
+
+
+def test_ranked_teammates_share_one_recap_with_lp(monkeypatch):
+    match = {"metadata": {"participants": ["a", "b"]}, "info": {"queueId": 420, "gameEndTimestamp": 0}}
+    asked = []
+
+    async def get_match_ids(puuid, region, session, count):
+        return ["EUW1_2", "EUW1_1"]
+
+    async def iter_match_data(match_ids, region, session):
+        for match_id in match_ids:
+            yield match_id, match
+
+    async def get_ranked_entries(puuid, region, session):
+        asked.append(puuid)
+        return [{"queueType": "RANKED_SOLO_5x5", "tier": "GOLD", "rank": "II", "leaguePoints": 40}]
+
+    monkeypatch.setattr(poller, "get_match_ids", get_match_ids)
+    monkeypatch.setattr(poller, "iter_match_data", iter_match_data)
+    monkeypatch.setattr(poller, "get_ranked_entries", get_ranked_entries)
+
+    def make_user():
+        user = SimpleNamespace(ranked={}, add_matches=lambda match_ids: list(match_ids))
+        user.set_ranked = lambda queue, state: user.ranked.__setitem__(queue, state)
+        return user
+
+    users = {"1": make_user(), "2": make_user()}
+    players = {"a": Player("a", "EUW", ["EUW1_1"]), "b": Player("b", "EUW", ["EUW1_1"])}
+    players["a"].subscribers.add(("1", "1"))
+    players["b"].subscribers.add(("1", "2"))
+    guild = SimpleNamespace(get_member=lambda discord_id: users[str(discord_id)])
+    track = SimpleNamespace(
+        get_guild=lambda guild_id: guild, save=lambda: None, index=SimpleNamespace(get=players.get)
+    )
+
+    events = []
+    async def on_new_match(event):
+        events.append(event)
+
+    match_poller = MatchPoller(track, None, on_new_match)
+    asyncio.run(match_poller._check(players["a"]))
+    asyncio.run(match_poller._check(players["b"]))
+
+    # Both ranks asked once, with the teammate's change riding on the first event
+    assert asked == ["a", "b"]
+    assert set(events[0].teammates_ranked) == {"b"}
+    assert events[1].ranked is events[0].teammates_ranked["b"]
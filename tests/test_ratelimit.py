@@ -0,0 +1,21 @@
+import time
+
+from riot.ratelimit import Bucket
+
+
+def test_padding_keeps_the_log_oldest_first():
+    bucket = Bucket([(5, 10)])
+    now = time.monotonic()
+    bucket.record(now - 9)
+    bucket.record(now - 1)
+
+    # Riot counted two requests we didn't see
+    bucket.update_limits([(5, 10)], [(4, 10)])
+    sent = list(bucket.windows[0].sent)
+    assert sent == sorted(sent)
+    assert len(sent) == 4
+
+    # One more fits now; once full, the wait ends when the oldest requests expire, not the newest
+    assert bucket.wait_time(now) == 0.0
+    bucket.record(now)
+    assert bucket.wait_time(now) < 1.5
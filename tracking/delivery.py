@@ -0,0 +1,255 @@
+# ========== Imports ==========
+import io
+import os
+import time
+import random
+import asyncio
+import aiohttp
+import discord
+
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from embeds.embeds import build_recap_embed
+from embeds.recap import render_recap_async
+from riot.ratelimit import Bucket
+from riot.records import MatchRecord, to_match_record
+from riot.riot_types import MatchData
+from tracking.models import User
+from tracking.poller import NewMatch
+from tracking.ranked import RankedChange
+from tracking.storage import TrackManager
+
+
+# ========== Constants ==========
+# Seconds a (match, guild) group stays open for other tracked players of the same game
+RECAP_GROUP_DELAY = float(os.getenv("RECAP_GROUP_DELAY", "5"))
+
+# Messages being built/sent at once
+RECAP_WORKERS = int(os.getenv("RECAP_WORKERS", "2"))
+
+# Attempts per message before it is dropped (429s, 5xx and connection errors are retried)
+SEND_ATTEMPTS = 4
+
+# Discord allows 5 messages per 5 seconds in a channel
+CHANNEL_LIMITS = [(5, 5)]
+
+# (match, guild) pairs remembered after posting, so a teammate polled later doesn't post the match again
+DELIVERED_MEMORY = 4096
+
+GroupKey = tuple[str, str]     # (match_id, guild_id)
+
+
+# ========== Class RecapGroup ==========
+class RecapGroup:
+    """Every tracked user of one guild that played one match, posted as a single message."""
+
+    __slots__ = ("match_id", "guild_id", "data", "users", "ranked")
+
+    def __init__(self, match_id: str, guild_id: str):
+        self.match_id = match_id
+        self.guild_id = guild_id
+        self.data: Optional[MatchData] = None
+        self.users: dict[str, User] = {}
+        self.ranked: dict[str, RankedChange] = {}   # discord_id -> rank change
+
+
+# ========== Class RecapDelivery ==========
+class RecapDelivery:
+    """
+    Posts match recaps in the channel configured for each guild (see `Guild.channel_id`).
+
+    New-match events go through an asyncio queue. Events for the same match and guild are grouped,
+    together with the guild's other tracked players found in the match data, so friends finishing
+    the same game get one message instead of several racing ones. Sends are paced per channel and
+    retried with backoff when Discord fails or rate limits them.
+
+    *Functions*:
+        `start()`: starts the workers.
+        `stop()`: cancels the workers and drops the pending groups.
+        `submit()`: queues a `NewMatch` event, usable as the poller's `on_new_match` callback.
+    """
+
+    def __init__(
+            self,
+            client: discord.Client,
+            track: TrackManager,
+            workers: int = RECAP_WORKERS,
+            group_delay: float = RECAP_GROUP_DELAY):
+        self.client = client
+        self.track = track
+        self.workers = workers
+        self.group_delay = group_delay
+
+        self._queue: asyncio.Queue[GroupKey] = asyncio.Queue()
+        self._pending: dict[GroupKey, RecapGroup] = {}
+        self._delivered: OrderedDict[GroupKey, None] = OrderedDict()
+        self._channels: dict[int, Bucket] = {}
+        self._channel_locks: dict[int, asyncio.Lock] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._timers: dict[GroupKey, asyncio.TimerHandle] = {}
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for timer in self._timers.values():
+            timer.cancel()
+        for task in self._tasks:
+            task.cancel()
+        self._timers, self._tasks = {}, []
+        self._pending.clear()
+
+    # ===== Grouping =====
+    async def submit(self, event: NewMatch):
+        """Adds the event's subscribers to the group of their guild, opening it if needed."""
+        puuids = set(event.data["metadata"]["participants"]) if event.data else set()
+
+        for subscriber in event.subscribers:
+            key = (event.match_id, subscriber.guild_id)
+            if key in self._delivered:
+                continue
+
+            # Removed from the bot (on_guild_remove) since the check
+            guild = self.track.find_guild(int(subscriber.guild_id))
+            if guild is None:
+                continue
+
+            group = self._pending.get(key)
+            if group is None:
+                group = self._pending[key] = RecapGroup(*key)
+                self._timers[key] = asyncio.get_running_loop().call_later(self.group_delay, self._ready, key)
+
+            group.users[subscriber.user.discord_id] = subscriber.user
+            if event.ranked is not None:
+                group.ranked[subscriber.user.discord_id] = event.ranked
+            if group.data is None and event.data is not None:
+                group.data = event.data
+                # Tracked teammates/opponents of this guild, even if their own check didn't come yet
+                teammates_ranked = event.teammates_ranked or {}
+                for member in guild.get_all_members():
+                    if member.puuid in puuids:
+                        group.users.setdefault(member.discord_id, member)
+                        if member.puuid in teammates_ranked:
+                            group.ranked.setdefault(member.discord_id, teammates_ranked[member.puuid])
+
+    def _ready(self, key: GroupKey):
+        self._timers.pop(key, None)
+        self._queue.put_nowait(key)
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            group = self._pending.pop(key, None)
+            if group is None:
+                continue
+
+            self._delivered[key] = None
+            if len(self._delivered) > DELIVERED_MEMORY:
+                self._delivered.popitem(last=False)
+
+            try:
+                await self._deliver(group)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Posting the recap of {group.match_id} in {group.guild_id} failed: {e}")
+
+    # ===== Posting =====
+    async def _channel(self, channel_id: int) -> Optional[discord.abc.Messageable]:
+        channel = self.client.get_channel(channel_id)
+        if channel is None:
+            try:
+                channel = await self.client.fetch_channel(channel_id)
+            except discord.HTTPException as e:
+                print(f"Recap channel {channel_id} is unavailable: {e}")
+                return None
+        return channel if isinstance(channel, discord.abc.Messageable) else None
+
+    async def _deliver(self, group: RecapGroup):
+        guild = self.track.find_guild(int(group.guild_id))
+        if guild is None:
+            # Removed while the group was pending: drop it rather than write the guild back
+            return
+
+        channel_id = guild.channel_id
+        if channel_id is None:
+            # No channel set with /set_channel yet
+            return
+
+        channel = await self._channel(channel_id)
+        if channel is None:
+            return
+
+        if group.data is None:
+            mentions = ", ".join(f"<@{discord_id}>" for discord_id in group.users)
+            await self._send(channel_id, channel, content=f"{mentions} finished {group.match_id}.")
+            return
+
+        match: MatchRecord = to_match_record(group.data)
+        players = []
+        for user in group.users.values():
+            participant = match.participant(user.puuid)
+            if participant is not None:
+                players.append((user, participant))
+        if not players:
+            return
+
+        cards = await asyncio.gather(*(render_recap_async(match, participant) for _, participant in players))
+        embed = build_recap_embed(match, players, group.ranked)
+        if len(cards) == 1:
+            embed.set_image(url="attachment://recap-0.png")
+        await self._send(channel_id, channel, embed=embed, cards=cards)
+
+    async def _acquire(self, channel_id: int):
+        """Waits until one more message may be sent in the channel."""
+        lock = self._channel_locks.setdefault(channel_id, asyncio.Lock())
+        bucket = self._channels.get(channel_id)
+        if bucket is None:
+            bucket = self._channels[channel_id] = Bucket(CHANNEL_LIMITS)
+
+        async with lock:
+            while True:
+                now = time.monotonic()
+                wait = bucket.wait_time(now)
+                if wait <= 0:
+                    bucket.record(now)
+                    return
+                await asyncio.sleep(wait)
+
+    async def _send(
+            self,
+            channel_id: int,
+            channel: discord.abc.Messageable,
+            content: Optional[str] = None,
+            embed: Optional[discord.Embed] = None,
+            cards: Optional[Sequence[bytes]] = None):
+        error: Exception = RuntimeError("no attempt made")
+
+        for attempt in range(SEND_ATTEMPTS):
+            await self._acquire(channel_id)
+            # Files are consumed by a send, so they're rebuilt for every attempt
+            files = [discord.File(io.BytesIO(card), filename=f"recap-{i}.png") for i, card in enumerate(cards or [])]
+
+            try:
+                if files:
+                    await channel.send(content=content, embed=embed, files=files)
+                else:
+                    await channel.send(content=content, embed=embed)
+                return
+            except (discord.Forbidden, discord.NotFound) as e:
+                print(f"Cannot post in channel {channel_id}: {e}")
+                return
+            except discord.HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    print(f"Discord rejected a recap for channel {channel_id}: {e}")
+                    return
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+
+            if attempt < SEND_ATTEMPTS - 1:
+                await asyncio.sleep(random.uniform(0, min(30.0, 2 ** attempt)))
+
+        print(f"Giving up on a recap for channel {channel_id}: {error}")
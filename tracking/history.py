@@ -0,0 +1,100 @@
+# ========== Imports ==========
+import os
+
+from collections import deque
+from typing import Iterable, Iterator, Optional, Sequence, overload
+
+
+# ========== Constants ==========
+# Matches kept per tracked user (and per tracked player in the global index)
+MATCH_HISTORY_DEPTH = int(os.getenv("MATCH_HISTORY_DEPTH", "10"))
+
+
+# ========== Classes ==========
+class MatchHistory:
+    """
+    Bounded match history, newest first.
+
+    A deque with `maxlen` drops the oldest match when a new one comes in, and an auxiliary set
+    makes "already recorded?" O(1) against the whole history instead of only the newest match.
+
+    *Functions*:
+        `add()`: records one match (newest), returns False if it was already recorded.
+        `add_many()`: records several matches at once, given newest first like Riot returns them.
+        `view()`: a read-only, zero-copy view of the history.
+    """
+
+    __slots__ = ("_matches", "_seen")
+
+    def __init__(self, matches: Iterable[str] = (), depth: int = MATCH_HISTORY_DEPTH):
+        self._matches: deque[str] = deque(maxlen=depth)
+        self._seen: set[str] = set()
+        self.add_many(matches)
+
+    @property
+    def depth(self) -> Optional[int]:
+        return self._matches.maxlen
+
+    @property
+    def recent(self) -> Optional[str]:
+        return self._matches[0] if self._matches else None
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._matches)
+
+    def __contains__(self, match_id: object) -> bool:
+        return match_id in self._seen
+
+    def add(self, match_id: str) -> bool:
+        if match_id in self._seen:
+            return False
+
+        if len(self._matches) == self._matches.maxlen:
+            self._seen.discard(self._matches[-1])
+
+        self._matches.appendleft(match_id)
+        self._seen.add(match_id)
+        return True
+
+    def add_many(self, match_ids: Iterable[str]) -> list[str]:
+        """Records the matches (given newest first) and returns the ones that were new, newest first."""
+        added = [match_id for match_id in reversed(list(match_ids)) if self.add(match_id)]
+        added.reverse()
+        return added
+
+    def view(self) -> "MatchHistoryView":
+        return MatchHistoryView(self._matches)
+
+    def to_list(self) -> list[str]:
+        return list(self._matches)
+
+
+class MatchHistoryView(Sequence[str]):
+    """Read-only view over a MatchHistory, newest first. Reflects later changes without copying."""
+
+    __slots__ = ("_matches",)
+
+    def __init__(self, matches: deque[str]):
+        self._matches = matches
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._matches)[index]
+        return self._matches[index]
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._matches)
+
+    def __repr__(self) -> str:
+        return f"MatchHistoryView({list(self._matches)!r})"
@@ -0,0 +1,123 @@
+# ========== Imports ==========
+from bisect import insort
+from typing import Iterable, Iterator, Optional
+
+from tracking.history import MatchHistory
+
+
+# ========== Constants ==========
+# Game end timestamps kept per player to estimate when they play
+ACTIVITY_DEPTH = 20
+
+
+# ========== Classes ==========
+class Player:
+    """
+    One Riot account, no matter how many guilds are tracking it.
+
+    `subscribers` holds a (guild_id, discord_id) pair for every guild member tracking this PUUID.
+    `history` is the global match history of the player, shared by every guild (in memory only).
+    `game_ends` holds the end times (epoch seconds, oldest first) of their latest known games.
+    """
+
+    __slots__ = ("puuid", "region", "riot_id", "history", "subscribers", "game_ends")
+
+    def __init__(self, puuid: str, region: str, matches: Iterable[str] = (), riot_id: Optional[str] = None):
+        self.puuid = puuid
+        self.region = region
+        self.riot_id = riot_id
+        self.history = MatchHistory(matches)
+        self.subscribers: set[tuple[str, str]] = set()
+        self.game_ends: list[float] = []
+
+    @property
+    def last_seen_match(self) -> Optional[str]:
+        return self.history.recent
+
+    @last_seen_match.setter
+    def last_seen_match(self, match_id: Optional[str]):
+        if match_id is not None:
+            self.history.add(match_id)
+
+    @property
+    def last_game_end(self) -> Optional[float]:
+        return self.game_ends[-1] if self.game_ends else None
+
+    def record_game_end(self, timestamp: float):
+        """Remembers when a game ended (epoch seconds), keeping the latest `ACTIVITY_DEPTH` ones."""
+        if timestamp in self.game_ends:
+            return
+        insort(self.game_ends, timestamp)
+        if len(self.game_ends) > ACTIVITY_DEPTH:
+            del self.game_ends[0]
+
+
+class PlayerIndex:
+    """
+    Global PUUID -> Player index over every guild in `TrackManager`.
+
+    Built once at load time and kept up to date by `Guild.add_member()`/`remove_member()`,
+    so the poller can check each player once and fan the result out to every subscriber.
+
+    *Functions*:
+        `get()`: gets the Player with a specific PUUID.
+        `find()`: gets the Player with a specific Riot ID ("name#tag") and region.
+        `subscribe()`: adds a (guild, member) pair to a PUUID.
+        `unsubscribe()`: removes a (guild, member) pair, dropping the Player once nobody tracks it.
+    """
+
+    def __init__(self):
+        self._players: dict[str, Player] = {}
+        self._by_riot_id: dict[tuple[str, str], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def __iter__(self) -> Iterator[Player]:
+        # Copy so callers can (un)subscribe while iterating
+        return iter(list(self._players.values()))
+
+    def get(self, puuid: str) -> Optional[Player]:
+        return self._players.get(puuid)
+
+    @staticmethod
+    def _riot_id_key(riot_id: str, region: str) -> tuple[str, str]:
+        # Riot IDs are case-insensitive
+        return riot_id.casefold(), region.upper()
+
+    def find(self, riot_id: str, region: str) -> Optional[Player]:
+        puuid = self._by_riot_id.get(self._riot_id_key(riot_id, region))
+        if puuid is None:
+            return None
+        return self._players.get(puuid)
+
+    def subscribe(
+            self,
+            puuid: str,
+            region: str,
+            guild_id: str,
+            discord_id: str,
+            matches: Iterable[str] = (),
+            riot_id: Optional[str] = None):
+        player = self._players.get(puuid)
+        if player is None:
+            player = self._players[puuid] = Player(puuid, region, matches)
+        elif not len(player.history):
+            player.history.add_many(matches)
+
+        if riot_id and player.riot_id is None:
+            player.riot_id = riot_id
+            self._by_riot_id[self._riot_id_key(riot_id, player.region)] = puuid
+
+        player.subscribers.add((guild_id, discord_id))
+
+    def unsubscribe(self, puuid: str, guild_id: str, discord_id: str):
+        player = self._players.get(puuid)
+        if player is None:
+            return
+
+        player.subscribers.discard((guild_id, discord_id))
+        if not player.subscribers:
+            del self._players[puuid]
+            if player.riot_id:
+                self._by_riot_id.pop(self._riot_id_key(player.riot_id, player.region), None)
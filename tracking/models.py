@@ -1,5 +1,17 @@
 # ========== Imports ==========
-from typing import Optional
+from functools import partial
+from itertools import count
+from typing import Callable, Optional
+
+from tracking.index import PlayerIndex
+from tracking.history import MatchHistory, MatchHistoryView
+from tracking.ranked import RankedState
+
+# Source of `Guild.revision`, unique across guilds so a re-added guild never reuses an old revision
+_revisions = count(1)
+
+# Called with (guild_id, discord_id) whenever a row has to be written on the next `save()`
+ChangeCallback = Callable[[str, Optional[str]], None]
 
 
 # ========== Classes ==========
@@ -12,16 +24,25 @@ class User:
         - `discord_id` only has a getter
         - `puuid`
         - `region`
-        - `matches`
+        - `riot_id` ("name#tag", None for users added before it was stored)
+        - `matches` (read-only view, newest first; the setter records one match)
         - `recent_match` only has a getter
+        - `ranked` only has a getter ({queueType: RankedState} as of the last ranked check)
+        `add_matches()`: records several new matches at once
+        `set_ranked()`: stores the rank of one queue
 
     **IMPORTANT**
-        Whenever you're with editing or adding to the json you're forced to use the `save()` function from `TrackManager()` or else your changes won't go through!!
+        Whenever you're with editing or adding to the database you're forced to use the `save()` function from `TrackManager()` or else your changes won't go through!!
     """
 
-    def __init__(self, discord_id: str, data: dict):
+    def __init__(self, discord_id: str, data: dict, on_change: Optional[Callable[[], None]] = None):
         self._id = discord_id
         self._data = data
+        self._on_change = on_change
+
+    def _changed(self):
+        if self._on_change is not None:
+            self._on_change()
     
     # GETTERS:
     @property
@@ -37,43 +58,70 @@ class User:
         return self._data["region"]
     
     @property
-    def matches(self) -> list[str]:
-        # Returns a copy so outside code doesn't break the internal list
-        return list(self._data["matches"])
+    def riot_id(self) -> Optional[str]:
+        return self._data.get("riot_id")
+
+    @property
+    def ranked(self) -> dict[str, RankedState]:
+        return {queue: RankedState.from_dict(state) for queue, state in (self._data.get("ranked") or {}).items()}
+
+    @property
+    def matches(self) -> MatchHistoryView:
+        # Read-only view, so outside code can't break the internal history (and nothing gets copied)
+        return self._history.view()
     
     @property
     def recent_match(self) -> Optional[str]:
-        matches = self._data["matches"]
-        # Check if list is NOT empty before accessing [0]
-        if matches:  
-            return matches[0]
-        
-        return None
+        return self._history.recent
+
+    @property
+    def _history(self) -> MatchHistory:
+        return self._data["matches"]
     
     # SETTERS:
     @puuid.setter
     def puuid(self, new_puuid: str):
         self._data["puuid"] = new_puuid
+        self._changed()
     
     @region.setter
     def region(self, new_region: str):
         self._data["region"] = new_region
+        self._changed()
+
+    @riot_id.setter
+    def riot_id(self, new_riot_id: str):
+        self._data["riot_id"] = new_riot_id
+        self._changed()
 
     @matches.setter
     def matches(self, match_id: str):
-        matches_list = self._data["matches"]
+        # Skipped if the match is anywhere in the history already, the oldest one drops out when full
+        if self._history.add(match_id):
+            self._changed()
 
-        # Check if match_id is in the list, or if it equals the latest one
-        # If the match is already the most recent one, we skip adding it
-        if matches_list and matches_list[0] == match_id:
-            return 
-        
-        # Insert at the top (newest match)
-        matches_list.insert(0, match_id)
+    def add_matches(self, match_ids: list[str]) -> list[str]:
+        """Records several matches at once, given newest first (like Riot returns them).
+
+        Returns:
+            list[str]: The matches that weren't recorded yet, newest first.
+        """
+        added = self._history.add_many(match_ids)
+        if added:
+            self._changed()
+        return added
+
+    def set_ranked(self, queue_type: str, state: Optional[RankedState]):
+        """Stores the rank of one ranked queue, or forgets it with None (e.g. unranked after a reset)."""
+        ranked = self._data.setdefault("ranked", {})
+        if state is None:
+            if ranked.pop(queue_type, None) is not None:
+                self._changed()
+            return
 
-        # Keep only the last 10 matches
-        if len(matches_list) > 10:
-            matches_list.pop()
+        if ranked.get(queue_type) != state.to_dict():
+            ranked[queue_type] = state.to_dict()
+            self._changed()
             
 
 class Guild:
@@ -82,23 +130,58 @@ class Guild:
 
     *Functions:*
         `guild_id`: gets you the guild id your working in
+        `channel_id`: the channel recaps are posted in (None until it's set)
+        `revision`: changes every time a member is added or removed (in memory only, not saved)
         `get_member()`: gets the member with the corresponding id
         `add_member()`: adds a member with the corresponding id, puuid, region
         `remove_member()`: removes a member with a corresponding id
     
     **IMPORTANT**
-        Whenever you are editing or adding to the json you're forced to use the `save()` 
+        Whenever you are editing or adding to the database you're forced to use the `save()` 
         function from `TrackManager()` or else your changes won't go through!!
     """
 
-    def __init__(self, guild_id: str, guild_data: dict):
+    def __init__(
+            self,
+            guild_id: str,
+            guild_data: dict,
+            index: Optional[PlayerIndex] = None,
+            on_change: Optional[ChangeCallback] = None):
         self._id = guild_id
         self._data = guild_data
+        self._index = index
+        self._on_change = on_change
+
+    def _user(self, discord_id_str: str, user_data: dict) -> "User":
+        on_change = None
+        if self._on_change is not None:
+            on_change = partial(self._on_change, self._id, discord_id_str)
+        return User(discord_id_str, user_data, on_change)
 
     @property
     def guild_id(self) -> str:
         return self._id
 
+    @property
+    def channel_id(self) -> Optional[int]:
+        channel_id = self._data.get("channel_id")
+        return int(channel_id) if channel_id else None
+
+    @channel_id.setter
+    def channel_id(self, new_channel_id: Optional[int]):
+        self._data["channel_id"] = str(new_channel_id) if new_channel_id else None
+        if self._on_change is not None:
+            self._on_change(self._id, None)
+
+    @property
+    def revision(self) -> int:
+        if "revision" not in self._data:
+            self._data["revision"] = next(_revisions)
+        return self._data["revision"]
+
+    def _bump_revision(self):
+        self._data["revision"] = next(_revisions)
+
     def get_member(self, discord_id: int) -> Optional[User]:
         """
         Gets the member from the guild with a specified id.
@@ -115,11 +198,17 @@ class Guild:
         users = self._data["users"]
 
         if discord_id_str in users:
-            return User(discord_id_str, users[discord_id_str])
+            return self._user(discord_id_str, users[discord_id_str])
         
         return None
     
-    def add_member(self, discord_id: int, puuid: str, region: str) -> Optional[User]:
+    def add_member(
+            self,
+            discord_id: int,
+            puuid: str,
+            region: str,
+            riot_id: Optional[str] = None,
+            matches: Optional[list[str]] = None) -> Optional[User]:
         """
         Adds a member to the guild with specified data.
 
@@ -129,6 +218,8 @@ class Guild:
             discord_id (int): the user's discord ID
             puuid (str): the user's puuid
             region (str): the region that the user is located at
+            riot_id (str, optional): the user's Riot ID ("name#tag")
+            matches (list[str], optional): the user's match history so far, newest first
 
         Returns:
             User: The added user
@@ -141,9 +232,15 @@ class Guild:
             users[discord_id_str] = {
                 "puuid": puuid,
                 "region": region,
-                "matches": []
+                "riot_id": riot_id,
+                "matches": MatchHistory(matches or [])
             }
-            return User(discord_id_str, users[discord_id_str])
+            if self._index is not None:
+                self._index.subscribe(puuid, region, self._id, discord_id_str, users[discord_id_str]["matches"], riot_id)
+            self._bump_revision()
+            if self._on_change is not None:
+                self._on_change(self._id, discord_id_str)
+            return self._user(discord_id_str, users[discord_id_str])
         
         return None
 
@@ -164,7 +261,12 @@ class Guild:
         users = self._data["users"]
 
         if discord_id_str in users:
-            del users[discord_id_str]
+            removed = users.pop(discord_id_str)
+            if self._index is not None:
+                self._index.unsubscribe(removed["puuid"], self._id, discord_id_str)
+            self._bump_revision()
+            if self._on_change is not None:
+                self._on_change(self._id, discord_id_str)
             return True
 
         return False
@@ -182,7 +284,7 @@ class Guild:
 
         # We iterate over the dictionary items to get both ID and Data
         for discord_id_str, user_data in self._data["users"].items():
-            user_object = User(discord_id_str, user_data)
+            user_object = self._user(discord_id_str, user_data)
             all_users.append(user_object)
             
         return all_users
\ No newline at end of file
@@ -0,0 +1,490 @@
+# ========== Imports ==========
+import os
+import time
+import heapq
+import random
+import asyncio
+
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, NamedTuple, Optional
+
+from riot.api import (
+    BATCH_CONCURRENCY, get_active_game, get_match_data, get_match_ids, get_ranked_entries, iter_match_data, match_cache
+)
+from riot.client import RiotHTTPClient
+from riot.decoding import decode_json
+from riot.errors import NotFound, RiotAPIError
+from riot.riot_types import CurrentGameInfo, MatchData
+from tracking.index import Player
+from tracking.models import User
+from tracking.ranked import RANKED_QUEUES, RankedChange, RankedState
+from tracking.storage import TrackManager
+from utils import metrics
+
+
+# ========== Constants ==========
+# Seconds between two checks of a player whose activity is unknown (and spread of the first checks)
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "120"))
+
+# Bounds of the adaptive interval: players on a streak are checked every MIN, dormant ones back off to MAX
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "90"))
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", str(3 * 3600)))
+
+# Growth of the interval after every check that found nothing
+POLL_BACKOFF = 1.5
+
+# A game that ended less than this many seconds ago means the player is likely to queue again
+STREAK_WINDOW = 3600
+
+# Hours (either side) around the hour of day of a past game that count as the player's usual play window
+PLAY_WINDOW_HOURS = 1
+
+# Seconds between two syncs of the schedule with the tracked players (new and removed ones)
+SCHEDULE_SYNC = 5.0
+
+# Optional: check players with spectator-v5 and fetch their match right after the game instead
+SPECTATOR_MODE = os.getenv("SPECTATOR_MODE", "").lower() in ("1", "true", "yes")
+
+# Only players checked at least this often (seconds) use spectator-v5: no game fits between two checks
+SPECTATOR_MAX_INTERVAL = 900
+
+# Seconds between two spectator-v5 checks of a game in progress (remakes and surrenders end it any time)
+LIVE_CHECK_INTERVAL = POLL_MIN_INTERVAL
+
+# Seconds between two fetches of a finished game's match until it's out
+MATCH_FETCH_RETRY = 60
+
+# Seconds after the end of a live game after which its match is given up and normal checks resume
+MATCH_FETCH_TIMEOUT = 30 * 60
+
+# (puuid, match_id) rank changes remembered, so a tracked teammate's own check reuses the one already asked
+RANKED_MEMORY = 1024
+
+# Match IDs asked per check, so several games played between two checks are all picked up
+POLL_DEPTH = 5
+
+
+# ========== Types ==========
+class Subscriber(NamedTuple):
+    guild_id: str
+    user: User
+
+class NewMatch(NamedTuple):
+    puuid: str
+    region: str
+    match_id: str
+    subscribers: list[Subscriber]     # every (guild, user) tracking this puuid
+    data: Optional[MatchData]         # fetched once, shared by every subscriber
+    ranked: Optional[RankedChange] = None   # rank before/after, on the newest new match of a ranked queue
+    teammates_ranked: Optional[dict[str, RankedChange]] = None   # puuid -> rank change of the other tracked players
+
+class LiveGame(NamedTuple):
+    match_id: str               # f"{platformId}_{gameId}", the Match-V5 ID once the game is over
+    ended: Optional[float]      # epoch seconds the game was seen gone, None while it's in progress
+
+NewMatchCallback = Callable[[NewMatch], Awaitable[None]]
+
+
+# ========== Class MatchPoller ==========
+class MatchPoller:
+    """
+    Background task that checks the tracked players for new matches, each on its own schedule.
+
+    Players come from the global PUUID index of `TrackManager`, so someone tracked in several guilds is
+    only checked once and every new match is downloaded once.
+    Checks are ordered in a priority queue by due time. After each check the next one is scheduled from
+    the player's activity (see `next_interval()`): right after a game or in their usual play window they
+    are checked every minute or two, dormant accounts back off toward hours, and a new match resets it.
+    Ranked state is only asked (once per player) when a check finds a new ranked match, never on a timer,
+    for that player and for the other tracked players of the match, who share its recap.
+
+    In spectator mode, players checked more often than a game lasts are checked with spectator-v5
+    instead. A game in progress is re-checked every `LIVE_CHECK_INTERVAL`; once it's gone its match
+    is fetched (retried until it's out), so the recap follows the end of the game by a minute or two,
+    remakes and surrenders included.
+
+    *Functions*:
+        `start()`: starts the background task (does nothing if it's already running).
+        `stop()`: cancels the background task.
+        `sweep()`: checks every tracked player once, spread over `interval` (ignores the schedule).
+    """
+
+    def __init__(
+            self,
+            track: TrackManager,
+            session: RiotHTTPClient,
+            on_new_match: NewMatchCallback,
+            interval: float = POLL_INTERVAL,
+            spectator: bool = SPECTATOR_MODE):
+        self.track = track
+        self.session = session
+        self.on_new_match = on_new_match
+        self.interval = interval
+        self.spectator = spectator
+        self._task: Optional[asyncio.Task] = None
+
+        # (due time on the monotonic clock, puuid); `_intervals` holds every scheduled or running puuid
+        self._schedule: list[tuple[float, str]] = []
+        self._intervals: dict[str, float] = {}
+        self._running: set[asyncio.Task] = set()
+        self._activity_loaded: set[str] = set()
+        self._live: dict[str, LiveGame] = {}
+        self._ranked_memory: OrderedDict[tuple[str, str], RankedChange] = OrderedDict()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in self._running:
+            task.cancel()
+        self._running.clear()
+        self._schedule.clear()
+        self._intervals.clear()
+        self._activity_loaded.clear()
+        self._live.clear()
+
+    async def _run(self):
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        while True:
+            self._sync_schedule()
+
+            now = time.monotonic()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, puuid = heapq.heappop(self._schedule)
+                player = self.track.index.get(puuid)
+                if player is None:
+                    # Nobody tracks it anymore
+                    self._intervals.pop(puuid, None)
+                    self._activity_loaded.discard(puuid)
+                    self._live.pop(puuid, None)
+                    continue
+
+                task = asyncio.create_task(self._check_scheduled(player, semaphore))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+            wait = self._schedule[0][0] - now if self._schedule else SCHEDULE_SYNC
+            await asyncio.sleep(min(max(wait, 0.0), SCHEDULE_SYNC))
+
+    def _sync_schedule(self):
+        """Schedules the players added since the last sync, their first checks spread over `interval`."""
+        now = time.monotonic()
+        for player in self.track.index:
+            if player.puuid not in self._intervals:
+                self._intervals[player.puuid] = self.interval
+                heapq.heappush(self._schedule, (now + random.uniform(0, self.interval), player.puuid))
+
+    async def _check_scheduled(self, player: Player, semaphore: asyncio.Semaphore):
+        found = False
+        delay: Optional[float] = None
+        async with semaphore:
+            if player.puuid not in self._activity_loaded:
+                self._activity_loaded.add(player.puuid)
+                try:
+                    await self._load_activity(player)
+                except Exception as e:
+                    # Activity only tunes the schedule: check the player anyway, as if it were unknown
+                    print(f"Loading the activity of {player.puuid} failed: {e}")
+            try:
+                spectate = self.spectator and (
+                    player.puuid in self._live or self._intervals.get(player.puuid, 0) <= SPECTATOR_MAX_INTERVAL
+                )
+                if spectate:
+                    found, delay = await self._spectate(player)
+                else:
+                    found = await self._check(player)
+                metrics.poll_checks.inc(result="new" if found else "none")
+            except RiotAPIError as e:
+                metrics.poll_checks.inc(result="error")
+                print(f"Polling {player.puuid} failed: {e}")
+            except Exception as e:
+                metrics.poll_checks.inc(result="error")
+                print(f"Polling {player.puuid} failed unexpectedly: {e}")
+
+        if player.puuid not in self._intervals:
+            # Stopped, or untracked while it was being checked
+            return
+
+        if delay is not None:
+            # A live game decides when to look again
+            heapq.heappush(self._schedule, (time.monotonic() + delay, player.puuid))
+            return
+
+        interval = next_interval(player, self._intervals[player.puuid], found, time.time(), self.interval)
+        self._intervals[player.puuid] = interval
+        # Jitter so players checked together drift apart
+        due = time.monotonic() + interval * random.uniform(0.9, 1.1)
+        heapq.heappush(self._schedule, (due, player.puuid))
+
+    async def _spectate(self, player: Player) -> tuple[bool, Optional[float]]:
+        """Spectator-mode check: one spectator-v5 call, or one match fetch while a finished game is awaited.
+
+        Returns:
+            tuple[bool, Optional[float]]: Whether new matches were announced, and the seconds until the
+                next check if a live game decides it (None to use the usual schedule).
+        """
+        now = time.time()
+        live = self._live.get(player.puuid)
+
+        if live is not None and live.ended is None:
+            game = await get_active_game(player.puuid, player.region, self.session)
+            if game is not None and _live_match_id(game) == live.match_id:
+                return False, LIVE_CHECK_INTERVAL
+            # Over (a 404, or already in the next game): its match is out shortly
+            live = self._live[player.puuid] = live._replace(ended=now)
+
+        if live is not None:
+            try:
+                # Cached once it's out, so the check below only asks for the IDs
+                await get_match_data(live.match_id, player.region, self.session)
+            except NotFound:
+                if now - live.ended < MATCH_FETCH_TIMEOUT:
+                    return False, MATCH_FETCH_RETRY
+            del self._live[player.puuid]
+            return await self._check(player), None
+
+        game = await get_active_game(player.puuid, player.region, self.session)
+        if game is None:
+            return False, None
+
+        match_id = _live_match_id(game)
+        if match_id in player.history:
+            # Still listed for a moment after it ended
+            return False, None
+
+        self._live[player.puuid] = LiveGame(match_id, None)
+        return False, LIVE_CHECK_INTERVAL
+
+    async def _load_activity(self, player: Player):
+        """Reads the end times of the player's known matches from the local match cache (no Riot calls)."""
+        for match_id in player.history:
+            raw = await asyncio.to_thread(match_cache.get, match_id)
+            if raw is None:
+                continue
+            end = decode_json(raw).get("info", {}).get("gameEndTimestamp")
+            if end:
+                player.record_game_end(end / 1000)
+
+    async def sweep(self):
+        """Checks every unique PUUID once, spread evenly (with jitter) over the polling interval."""
+        players = list(self.track.index)
+        if not players:
+            await asyncio.sleep(self.interval)
+            return
+
+        random.shuffle(players)
+        slot = self.interval / len(players)
+
+        checks = [
+            self._check_later(i * slot + random.uniform(0, slot), player)
+            for i, player in enumerate(players)
+        ]
+        await asyncio.gather(*checks)
+
+    async def _check_later(self, delay: float, player: Player):
+        await asyncio.sleep(delay)
+        try:
+            await self._check(player)
+        except RiotAPIError as e:
+            # Nothing was recorded, so the next sweep simply tries again
+            print(f"Polling {player.puuid} failed: {e}")
+        except Exception as e:
+            print(f"Polling {player.puuid} failed unexpectedly: {e}")
+
+    def _subscribers(self, player: Player) -> list[Subscriber]:
+        subscribers = []
+        for guild_id, discord_id in player.subscribers:
+            user = self.track.get_guild(int(guild_id)).get_member(int(discord_id))
+            if user is not None:
+                subscribers.append(Subscriber(guild_id, user))
+        return subscribers
+
+    async def _check(self, player: Player) -> bool:
+        """Checks one player and announces their new matches. Returns True if there were any."""
+        match_ids = await get_match_ids(player.puuid, player.region, self.session, count=POLL_DEPTH)
+
+        # Newest first: everything before the first match we know is new
+        new_ids = []
+        for match_id in match_ids:
+            if match_id in player.history:
+                break
+            new_ids.append(match_id)
+
+        if not new_ids:
+            return False
+
+        if not len(player.history):
+            # Nothing to compare against yet (e.g. no matches when added): only remember them
+            player.history.add_many(new_ids)
+            return False
+
+        # Fetch before recording anything: a transient error leaves the matches "new" for the next sweep
+        data: dict[str, Optional[MatchData]] = {}
+        async for match_id, result in iter_match_data(new_ids, player.region, self.session):
+            if isinstance(result, NotFound):
+                result = None
+            elif isinstance(result, RiotAPIError):
+                raise result
+            data[match_id] = result
+
+        player.history.add_many(new_ids)
+        subscribers = self._subscribers(player)
+
+        for match in data.values():
+            end = match["info"].get("gameEndTimestamp") if match else None
+            if end:
+                player.record_game_end(end / 1000)
+
+        # Only the subscribers that hadn't recorded a match get an event for it
+        receivers: dict[str, list[Subscriber]] = {match_id: [] for match_id in new_ids}
+        for sub in subscribers:
+            for match_id in sub.user.add_matches(new_ids):
+                receivers[match_id].append(sub)
+
+        # The newest new match of each ranked queue carries the rank change since the last check
+        newest_ranked: dict[str, str] = {}
+        for match_id in new_ids:
+            match = data[match_id]
+            queue = RANKED_QUEUES.get(match["info"].get("queueId", 0)) if match else None
+            if queue is not None:
+                newest_ranked.setdefault(queue, match_id)
+
+        ranked_by_match: dict[str, Optional[RankedChange]] = {}
+        teammates_by_match: dict[str, dict[str, RankedChange]] = {}
+        if newest_ranked:
+            ranked_by_match = await self._match_ranked_changes(player, subscribers, newest_ranked)
+            # Tracked players of the same game are grouped into one recap with this one (see RecapDelivery),
+            # so their rank is asked now too; their own check finds it in `_ranked_memory`
+            for match_id in newest_ranked.values():
+                teammates_by_match[match_id] = await self._teammates_ranked_changes(player, data[match_id], match_id)
+        self.track.save()
+
+        # Oldest first, in the order they were played
+        for match_id in reversed(new_ids):
+            if receivers[match_id]:
+                event = NewMatch(
+                    player.puuid, player.region, match_id, receivers[match_id], data[match_id],
+                    ranked_by_match.get(match_id), teammates_by_match.get(match_id),
+                )
+                await self.on_new_match(event)
+        return True
+
+    async def _match_ranked_changes(
+            self,
+            player: Player,
+            subscribers: list[Subscriber],
+            newest_ranked: dict[str, str]) -> dict[str, Optional[RankedChange]]:
+        """Rank change of each queue -> match ID in `newest_ranked`, asked once unless already remembered.
+
+        Returns:
+            dict[str, Optional[RankedChange]]: match ID -> rank change (None if it couldn't be fetched).
+        """
+        by_match = {match_id: self._ranked_memory.get((player.puuid, match_id)) for match_id in newest_ranked.values()}
+        missing = [queue for queue, match_id in newest_ranked.items() if by_match[match_id] is None]
+        if missing:
+            changes = await self._ranked_changes(player, subscribers, missing)
+            for queue in missing:
+                change = changes.get(queue)
+                if change is not None:
+                    by_match[newest_ranked[queue]] = change
+                    self._remember_ranked(player.puuid, newest_ranked[queue], change)
+        return by_match
+
+    async def _teammates_ranked_changes(
+            self,
+            player: Player,
+            match: Optional[MatchData],
+            match_id: str) -> dict[str, RankedChange]:
+        """Rank changes in this match of the other tracked participants, by puuid."""
+        if match is None:
+            return {}
+        queue = RANKED_QUEUES[match["info"]["queueId"]]
+
+        changes = {}
+        for puuid in match["metadata"]["participants"]:
+            other = self.track.index.get(puuid) if puuid != player.puuid else None
+            if other is None:
+                continue
+            by_match = await self._match_ranked_changes(other, self._subscribers(other), {queue: match_id})
+            if by_match[match_id] is not None:
+                changes[puuid] = by_match[match_id]
+        return changes
+
+    def _remember_ranked(self, puuid: str, match_id: str, change: RankedChange):
+        self._ranked_memory[(puuid, match_id)] = change
+        if len(self._ranked_memory) > RANKED_MEMORY:
+            self._ranked_memory.popitem(last=False)
+
+    async def _ranked_changes(
+            self,
+            player: Player,
+            subscribers: list[Subscriber],
+            queues: Iterable[str]) -> dict[str, RankedChange]:
+        """Fetches the player's ranked entries once and stores the new rank of `queues` on every subscriber.
+
+        Returns:
+            dict[str, RankedChange]: The change of each queue, empty if the entries couldn't be fetched.
+        """
+        try:
+            entries = await get_ranked_entries(player.puuid, player.region, self.session)
+        except RiotAPIError as e:
+            # The matches are still announced, only without LP
+            print(f"Ranked check of {player.puuid} failed: {e}")
+            return {}
+
+        states = {entry.get("queueType", ""): RankedState.from_entry(entry) for entry in entries}
+        changes = {}
+        for queue in queues:
+            after = states.get(queue)
+            # Every subscriber stores the same rank, the first one that has it is enough
+            before = next((sub.user.ranked[queue] for sub in subscribers if queue in sub.user.ranked), None)
+            changes[queue] = RankedChange(queue, before, after)
+            for sub in subscribers:
+                sub.user.set_ranked(queue, after)
+        return changes
+
+
+# ========== Functions ==========
+def _live_match_id(game: CurrentGameInfo) -> str:
+    return f"{game.get('platformId', '')}_{game.get('gameId', 0)}"
+
+
+def _in_play_window(player: Player, now: float) -> bool:
+    hour = now // 3600 % 24
+    for end in player.game_ends:
+        distance = abs(end // 3600 % 24 - hour)
+        if min(distance, 24 - distance) <= PLAY_WINDOW_HOURS:
+            return True
+    return False
+
+
+def next_interval(player: Player, previous: float, found: bool, now: float, default: float = POLL_INTERVAL) -> float:
+    """Seconds until the next check of a player.
+
+    Args:
+        player (Player): The player that was just checked.
+        previous (float): The interval that led to this check.
+        found (bool): Whether this check found new matches.
+        now (float): The current epoch time in seconds.
+        default (float): The interval of players whose activity is unknown.
+
+    Returns:
+        float: `POLL_MIN_INTERVAL` after a detection or a recent game, at most `default` during the
+            player's usual play window, otherwise (dormant or unknown activity) the previous interval
+            backed off up to `POLL_MAX_INTERVAL`.
+    """
+    if found:
+        return POLL_MIN_INTERVAL
+
+    last = player.last_game_end
+    if last is not None and now - last < STREAK_WINDOW:
+        return POLL_MIN_INTERVAL
+
+    backed_off = min(POLL_MAX_INTERVAL, max(previous * POLL_BACKOFF, POLL_MIN_INTERVAL))
+    if last is not None and _in_play_window(player, now):
+        return min(backed_off, default)
+    return backed_off
@@ -0,0 +1,82 @@
+# ========== Imports ==========
+from typing import NamedTuple, Optional
+
+from riot.riot_types import LeagueEntryData
+
+
+# ========== Constants ==========
+# Match-V5 queueId -> League-V4 queueType, for the queues that change LP
+RANKED_QUEUES = {
+    420: "RANKED_SOLO_5x5",
+    440: "RANKED_FLEX_SR",
+}
+
+TIERS = ("IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "EMERALD", "DIAMOND", "MASTER", "GRANDMASTER", "CHALLENGER")
+DIVISIONS = ("IV", "III", "II", "I")
+
+# Master and above have no divisions, only LP on top of Diamond I
+_APEX = TIERS.index("MASTER")
+
+
+# ========== Types ==========
+class RankedState(NamedTuple):
+    """Tier, division and LP of one player in one ranked queue."""
+
+    tier: str
+    division: str
+    lp: int
+    wins: int = 0
+    losses: int = 0
+
+    @classmethod
+    def from_entry(cls, entry: LeagueEntryData) -> "RankedState":
+        return cls(entry.get("tier", ""), entry.get("rank", ""), entry.get("leaguePoints", 0),
+                   entry.get("wins", 0), entry.get("losses", 0))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RankedState":
+        return cls(data["tier"], data["division"], data["lp"], data.get("wins", 0), data.get("losses", 0))
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+    @property
+    def ladder_points(self) -> int:
+        """LP counted from Iron IV 0 LP, so two states can be compared across divisions and tiers."""
+        tier = TIERS.index(self.tier) if self.tier in TIERS else 0
+        if tier >= _APEX:
+            return _APEX * 400 + self.lp
+        division = DIVISIONS.index(self.division) if self.division in DIVISIONS else 0
+        return tier * 400 + division * 100 + self.lp
+
+    def __str__(self) -> str:
+        if self.tier in TIERS and TIERS.index(self.tier) >= _APEX:
+            return f"{self.tier.title()} {self.lp} LP"
+        return f"{self.tier.title()} {self.division} {self.lp} LP"
+
+
+class RankedChange(NamedTuple):
+    """A player's rank in one queue before and after their latest ranked match(es)."""
+
+    queue_type: str
+    before: Optional[RankedState]
+    after: Optional[RankedState]
+
+    @property
+    def lp_delta(self) -> Optional[int]:
+        if self.before is None or self.after is None:
+            return None
+        return self.after.ladder_points - self.before.ladder_points
+
+    def __str__(self) -> str:
+        if self.after is None:
+            return "Unranked"
+
+        delta = self.lp_delta
+        if delta is None:
+            return str(self.after)
+
+        text = f"{self.after} ({delta:+d} LP)"
+        if (self.before.tier, self.before.division) != (self.after.tier, self.after.division):
+            text += " · Promoted" if delta > 0 else " · Demoted"
+        return text
@@ -1,75 +1,377 @@
 # ========== Imports ==========
 import os
 import json
-from typing import Optional
+import sqlite3
+import asyncio
+import threading
+from typing import Any, Optional
 
 from tracking.models import Guild
+from tracking.index import PlayerIndex
+from tracking.history import MatchHistory
+from utils import metrics
 
 
 # ========== Constants ==========
-FILE = "tracking/track.json"
+FILE = "tracking/track.db"
+LEGACY_FILE = "tracking/track.json"
+
+SCHEMA_VERSION = 4
+
+# Seconds between two background flushes in write-behind mode
+SAVE_INTERVAL = float(os.getenv("SAVE_INTERVAL", "5"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guilds (
+    guild_id    TEXT PRIMARY KEY,
+    channel_id  TEXT
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    guild_id    TEXT NOT NULL,
+    discord_id  TEXT NOT NULL,
+    puuid       TEXT NOT NULL,
+    region      TEXT NOT NULL,
+    riot_id     TEXT,
+    matches     TEXT NOT NULL DEFAULT '[]',
+    ranked      TEXT,
+    PRIMARY KEY (guild_id, discord_id)
+);
+
+CREATE INDEX IF NOT EXISTS users_by_puuid ON users (puuid);
+"""
 
 
 # ========== Class TrackManager ==========
 class TrackManager:
     """
-    TrackManager is a class where your able to add a new guild with an ID or get a guild with a specific ID and save it in the json file.
+    TrackManager is a class where your able to add a new guild with an ID or get a guild with a specific ID and save it in the database.
+
+    Everything is kept in memory in `data`; the models report which rows they changed so `save()`
+    only upserts/deletes those rows in SQLite instead of rewriting everything.
+    An old track.json is migrated once when the database is first created.
+
+    After `start_writer()` the manager runs in write-behind mode: `save()` only marks the changes as
+    pending and a background task writes them at most every `SAVE_INTERVAL` seconds, off the event loop.
+
+    Nothing is read at construction: the database is opened and loaded on first use, or ahead of time
+    on a worker thread with `load_async()` (e.g. while the gateway connects).
 
     *Functions*:
         `get_guild()`: you can get a specific guild with an ID.
         `add_guild()`: you add a guild.
-        `save()`: save your changes to the json.
-    
+        `get_all_guilds()`: you get every guild that is being tracked.
+        `index`: the global PUUID index over every guild, see `PlayerIndex`.
+        `load()` / `load_async()`: loads the database now instead of on first use.
+        `save()`: save your changes to the database.
+        `start_writer()`: switches to write-behind mode.
+        `stop_writer()`: stops the background writer and flushes.
+        `flush()`: writes every pending change right now.
+        `close()`: flushes and closes the database connection.
+
     **IMPORTANT**
-        When ever your with editing or adding to the json you're forced to use the `save()` function or else your changes won't go through!!
+        When ever your with editing or adding to the database you're forced to use the `save()` function or else your changes won't go through!!
     """
 
-    def __init__(self):
-        self.path = FILE
-        self.data = self._load()
-
-    def _load(self) -> dict:
-        if not os.path.exists(self.path):
-            return {"guilds": {}}
-
-        with open(self.path, "r") as f:
-            data = json.load(f)
-        
-        # Ensure "guilds" key exists
-        if "guilds" not in data or not isinstance(data["guilds"], dict):
-            data["guilds"] = {}
-        
+    def __init__(self, path: str = FILE, legacy_path: str = LEGACY_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+
+        # (guild_id, None) for a guild row, (guild_id, discord_id) for a user row
+        self._dirty: set[tuple[str, Optional[str]]] = set()
+
+        self._write_lock = threading.Lock()
+        self._writer: Optional[asyncio.Task] = None
+
+        # Filled in by `load()`
+        self._load_lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._data: Optional[dict] = None
+        self._index: Optional[PlayerIndex] = None
+
+    def load(self):
+        """Opens the database and loads every guild into memory. Does nothing if it's already loaded."""
+        with self._load_lock:
+            if self._data is not None:
+                return
+
+            connection = self._connect()
+            data = self._load(connection)
+            self._index = self._build_index(data)
+            self._connection = connection
+            self._data = data
+
+    async def load_async(self):
+        """Same as `load()`, but on a worker thread so the event loop keeps running."""
+        await asyncio.to_thread(self.load)
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self.load()
+        return self._data
+
+    @property
+    def index(self) -> PlayerIndex:
+        if self._index is None:
+            self.load()
+        return self._index
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.load()
+        return self._connection
+
+    def _connect(self) -> sqlite3.Connection:
+        # Writes happen on a worker thread in write-behind mode, always under `_write_lock`
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            self._migrate_legacy(db)
+        if version == 1:
+            db.execute("ALTER TABLE users ADD COLUMN riot_id TEXT")
+        if 1 <= version <= 2:
+            db.execute("ALTER TABLE guilds ADD COLUMN channel_id TEXT")
+        if 1 <= version <= 3:
+            db.execute("ALTER TABLE users ADD COLUMN ranked TEXT")
+        if version < SCHEMA_VERSION:
+            db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return db
+
+    def _migrate_legacy(self, db: sqlite3.Connection):
+        """Imports the old track.json into a freshly created database and renames the file."""
+        if not os.path.exists(self.legacy_path):
+            return
+
+        with open(self.legacy_path, "r") as f:
+            legacy = json.load(f)
+
+        guilds = legacy.get("guilds")
+        if not isinstance(guilds, dict):
+            guilds = {}
+
+        with db:
+            for guild_id, guild_data in guilds.items():
+                db.execute("INSERT OR IGNORE INTO guilds (guild_id) VALUES (?)", (guild_id,))
+                for discord_id, user_data in guild_data.get("users", {}).items():
+                    db.execute(
+                        "INSERT OR REPLACE INTO users (guild_id, discord_id, puuid, region, matches) VALUES (?, ?, ?, ?, ?)",
+                        (guild_id, discord_id, user_data["puuid"], user_data["region"], json.dumps(user_data.get("matches", []))),
+                    )
+
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        print(f"Migrated {len(guilds)} guild(s) from {self.legacy_path} to {self.path}")
+
+    def _load(self, db: sqlite3.Connection) -> dict:
+        data: dict = {"guilds": {}}
+        guilds = data["guilds"]
+
+        for guild_id, channel_id in db.execute("SELECT guild_id, channel_id FROM guilds"):
+            guilds[guild_id] = {"users": {}, "channel_id": channel_id}
+
+        rows = db.execute("SELECT guild_id, discord_id, puuid, region, riot_id, matches, ranked FROM users")
+        for guild_id, discord_id, puuid, region, riot_id, matches, ranked in rows:
+            guild_data = guilds.setdefault(guild_id, {"users": {}})
+            guild_data["users"][discord_id] = {
+                "puuid": puuid,
+                "region": region,
+                "riot_id": riot_id,
+                "matches": MatchHistory(json.loads(matches)),
+                "ranked": json.loads(ranked) if ranked else {},
+            }
+
         return data
 
-    
+    def _build_index(self, data: dict) -> PlayerIndex:
+        index = PlayerIndex()
+        for guild_id, guild_data in data["guilds"].items():
+            for discord_id, user_data in guild_data["users"].items():
+                index.subscribe(
+                    user_data["puuid"],
+                    user_data["region"],
+                    guild_id,
+                    discord_id,
+                    user_data["matches"],
+                    user_data.get("riot_id"),
+                )
+        return index
+
+    def _mark_dirty(self, guild_id: str, discord_id: Optional[str] = None):
+        self._dirty.add((guild_id, discord_id))
+
+
     def save(self):
-        """Saves the changes made to the json file.
+        """Saves the changes made since the last save to the database, one row at a time.
+        In write-behind mode this only leaves them for the background writer.
         """
-        with open(self.path, 'w') as f:
-            json.dump(self.data, f, indent=4)
-    
+        if self._writer is not None and not self._writer.done():
+            return
+        self.flush()
+
+    def flush(self):
+        """Writes every pending change to the database right now."""
+        dirty, ops = self._snapshot()
+        try:
+            self._write(ops)
+        except Exception:
+            self._restore(dirty)
+            raise
+
+    def start_writer(self, interval: float = SAVE_INTERVAL):
+        """Starts the background writer (write-behind mode). Must be called from the event loop."""
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_behind(interval))
+
+    async def stop_writer(self):
+        """Stops the background writer and flushes what is still pending."""
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        dirty, ops = self._snapshot()
+        try:
+            await asyncio.to_thread(self._write, ops)
+        except Exception:
+            self._restore(dirty)
+            raise
+
+    async def _write_behind(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            if not self._dirty:
+                continue
+            # Snapshot on the loop (the data is only mutated here), write on a worker thread
+            dirty, ops = self._snapshot()
+            try:
+                await asyncio.to_thread(self._write, ops)
+            except Exception as e:
+                # Retried by the next write, or by stop_writer() at shutdown
+                self._restore(dirty)
+                print(f"Saving tracked users failed: {e}")
+
+    def _restore(self, dirty: set[tuple[str, Optional[str]]]):
+        """Marks the keys of a failed write dirty again. Their rows are rebuilt from the current data."""
+        self._dirty |= dirty
+
+    def _snapshot(self) -> tuple[set[tuple[str, Optional[str]]], list[tuple[str, tuple[Any, ...]]]]:
+        """Turns the pending changes into SQL statements and clears them.
+        The changed keys come along so a failed write can put them back with `_restore()`.
+        """
+        if not self._dirty:
+            return set(), []
+        dirty, self._dirty = self._dirty, set()
+        guilds = self.data["guilds"]
+        ops: list[tuple[str, tuple[Any, ...]]] = []
+
+        for guild_id, discord_id in dirty:
+            guild_data = guilds.get(guild_id)
+
+            if guild_data is None:
+                ops.append(("DELETE FROM users WHERE guild_id = ?", (guild_id,)))
+                ops.append(("DELETE FROM guilds WHERE guild_id = ?", (guild_id,)))
+                continue
+
+            if discord_id is None:
+                ops.append((
+                    "INSERT INTO guilds (guild_id, channel_id) VALUES (?, ?) "
+                    "ON CONFLICT (guild_id) DO UPDATE SET channel_id = excluded.channel_id",
+                    (guild_id, guild_data.get("channel_id")),
+                ))
+                continue
+
+            user_data = guild_data["users"].get(discord_id)
+            if user_data is None:
+                ops.append(("DELETE FROM users WHERE guild_id = ? AND discord_id = ?", (guild_id, discord_id)))
+                continue
+
+            ops.append((
+                "INSERT INTO users (guild_id, discord_id, puuid, region, riot_id, matches, ranked) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (guild_id, discord_id) DO UPDATE SET "
+                "puuid = excluded.puuid, region = excluded.region, riot_id = excluded.riot_id, "
+                "matches = excluded.matches, ranked = excluded.ranked",
+                (
+                    guild_id, discord_id, user_data["puuid"], user_data["region"],
+                    user_data.get("riot_id"), json.dumps(user_data["matches"].to_list()),
+                    json.dumps(user_data.get("ranked") or {}),
+                ),
+            ))
+
+        return dirty, ops
+
+    def _write(self, ops: list[tuple[str, tuple[Any, ...]]]):
+        """Runs the statements in one transaction, so a crash never leaves half a save behind."""
+        if not ops:
+            return
+
+        with self._write_lock, metrics.storage_write.time(), self._db:
+            for sql, params in ops:
+                self._db.execute(sql, params)
+
+    def close(self):
+        """Saves any pending changes and closes the database connection."""
+        if self._connection is None:
+            return
+        self.flush()
+        with self._write_lock:
+            self._connection.close()
+
     def get_guild(self, guild_id: int) -> Optional[Guild]:
-        """Returns Guild loaded from the json if it exists, else None"""
+        """Returns Guild loaded from the database if it exists, else None"""
         str_guild_id = str(guild_id)
         guild_data = self.data["guilds"].get(str_guild_id)
         if guild_data is None:
             guild_data = {"users": {}}
             self.data["guilds"][str_guild_id] = guild_data
+            self._mark_dirty(str_guild_id)
 
-        return Guild(str_guild_id, guild_data)
+        return Guild(str_guild_id, guild_data, self.index, self._mark_dirty)
+
+    def find_guild(self, guild_id: int) -> Optional[Guild]:
+        """Returns the Guild if it's in the database, else None. Unlike `get_guild()`, never creates it."""
+        str_guild_id = str(guild_id)
+        guild_data = self.data["guilds"].get(str_guild_id)
+        if guild_data is None:
+            return None
+        return Guild(str_guild_id, guild_data, self.index, self._mark_dirty)
+
+
+    def get_all_guilds(self) -> list[Guild]:
+        """Returns every Guild loaded from the database."""
+        return [
+            Guild(guild_id, guild_data, self.index, self._mark_dirty)
+            for guild_id, guild_data in self.data["guilds"].items()
+        ]
 
 
     def add_guild(self, guild_id: int):
-        """Adds a discord Guild to the track.json. Needs its ID.
+        """Adds a discord Guild to the database. Needs its ID.
         """
-        self.data["guilds"].setdefault(str(guild_id), {"users": {}})
+        str_guild_id = str(guild_id)
+        if str_guild_id not in self.data["guilds"]:
+            self.data["guilds"][str_guild_id] = {"users": {}}
+            self._mark_dirty(str_guild_id)
         return
-    
+
     def remove_guild(self, guild_id: int) -> bool:
-        """Removes a discord Guild from the track.json. Needs its ID.
+        """Removes a discord Guild from the database. Needs its ID.
         Returns:
             bool: True if success, False if Guilds doesn't exist.
         """
-        if self.data["guilds"].pop(str(guild_id), None) is not None:
-            return True
-        return False
+        str_guild_id = str(guild_id)
+        guild_data = self.data["guilds"].pop(str_guild_id, None)
+        if guild_data is None:
+            return False
+
+        for discord_id, user_data in guild_data["users"].items():
+            self.index.unsubscribe(user_data["puuid"], str_guild_id, discord_id)
+            self._mark_dirty(str_guild_id, discord_id)
+        self._mark_dirty(str_guild_id)
+        return True
@@ -1,13 +1,25 @@
 # ========== Imports ==========
 import os
+import json
+import time
+import asyncio
+import hashlib
 import discord
 
 from tracking.storage import TrackManager
 from tracking.models import Guild
-from typing import Optional
+from typing import Iterable, Optional
 
 DEV_IDS = {int(x) for x in os.getenv("DEV_IDS", "").split(",") if x.strip()}
 
+# Seconds a resolved discord_id -> display name is reused
+NAME_CACHE_TTL = float(os.getenv("NAME_CACHE_TTL", "600"))
+
+_name_cache: dict[tuple[Optional[int], int], tuple[str, float]] = {}
+
+# Hash of the command signatures last synced to Discord, per scope ("global" or a guild ID)
+COMMAND_HASH_FILE = os.getenv("COMMAND_HASH_FILE", "tracking/command_tree.json")
+
 
 # ========== Functions ==========
 def get_guild_from_interaction(interaction: discord.Interaction, track: TrackManager) -> Optional[Guild]:
@@ -21,4 +33,94 @@ async def validate_user(interaction: discord.Interaction) -> bool:
     """Checks if the user is allowed to use the following command, this means its part of the env file"""
     if not DEV_IDS:
         return False
-    return interaction.user.id in DEV_IDS
\ No newline at end of file
+    return interaction.user.id in DEV_IDS
+
+async def resolve_display_names(
+        client: discord.Client,
+        guild: Optional[discord.Guild],
+        discord_ids: Iterable[int]
+) -> dict[int, str]:
+    """Returns {discord_id: display name} for every ID.
+
+    Looks in the TTL cache first, then in the gateway cache (guild members, then users), and only
+    fetches the remaining ones from Discord's REST API, all at once instead of one after another.
+    Users that can't be fetched are shown as "Unknown user".
+    """
+    guild_id = guild.id if guild else None
+    now = time.monotonic()
+    names: dict[int, str] = {}
+    missing: list[int] = []
+
+    for discord_id in discord_ids:
+        cached = _name_cache.get((guild_id, discord_id))
+        if cached is not None and cached[1] > now:
+            names[discord_id] = cached[0]
+            continue
+
+        member = guild.get_member(discord_id) if guild else None
+        user = member or client.get_user(discord_id)
+        if user is not None:
+            names[discord_id] = user.display_name
+        else:
+            missing.append(discord_id)
+
+    fetched = await asyncio.gather(*(client.fetch_user(i) for i in missing), return_exceptions=True)
+    for discord_id, result in zip(missing, fetched):
+        if isinstance(result, BaseException):
+            names[discord_id] = "Unknown user"
+            continue
+        names[discord_id] = result.display_name
+
+    expires_at = now + NAME_CACHE_TTL
+    for discord_id, name in names.items():
+        _name_cache[(guild_id, discord_id)] = (name, expires_at)
+
+    return names
+
+
+def _command_tree_hash(tree: discord.app_commands.CommandTree, guild: Optional[discord.abc.Snowflake]) -> str:
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"]),
+    )
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+async def sync_commands(
+        tree: discord.app_commands.CommandTree,
+        guild: Optional[discord.abc.Snowflake] = None,
+        path: str = COMMAND_HASH_FILE
+) -> bool:
+    """Syncs the command tree with Discord, but only if the command signatures changed since the last sync.
+
+    A sync is a rate-limited HTTP call that Discord doesn't need when nothing changed, so the hash of
+    the synced signatures is kept in `path` and compared first.
+
+    Args:
+        tree (CommandTree): The command tree.
+        guild (Snowflake, optional): Sync the commands of this guild instead of the global ones.
+        path (str): JSON file holding the last synced hash per scope.
+
+    Returns:
+        bool: True if the tree was synced, False if it was already up to date.
+    """
+    scope = str(guild.id) if guild else "global"
+    current = _command_tree_hash(tree, guild)
+
+    hashes: dict[str, str] = {}
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                hashes = json.load(f)
+        except (OSError, ValueError):
+            hashes = {}
+
+    if hashes.get(scope) == current:
+        return False
+
+    await tree.sync(guild=guild)
+
+    hashes[scope] = current
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(hashes, f, indent=2)
+    return True
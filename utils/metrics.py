@@ -0,0 +1,180 @@
+# ========== Imports ==========
+import os
+import time
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+# ========== Constants ==========
+# Port of the optional Prometheus text endpoint, disabled when unset
+METRICS_PORT = os.getenv("METRICS_PORT")
+
+# Upper bounds (seconds) of the latency buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+# ========== Classes ==========
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set, like Prometheus'."""
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        # label set -> [per-bucket counts (+1 for +Inf), sum, count]
+        self.values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+        entry[1][1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def quantile(self, q: float, key: Labels) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if nothing observed)."""
+        entry = self.values.get(key)
+        if entry is None or not entry[1][1]:
+            return None
+
+        target = q * entry[1][1]
+        seen = 0
+        for i, count in enumerate(entry[0]):
+            seen += count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+# ========== Registry ==========
+_metrics: list[Counter | Histogram] = []
+
+def counter(name: str, description: str) -> Counter:
+    metric = Counter(name, description)
+    _metrics.append(metric)
+    return metric
+
+def histogram(name: str, description: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+    metric = Histogram(name, description, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+# Hot paths of the bot
+riot_requests = counter("riot_requests_total", "Riot API responses by endpoint, routing host and status")
+riot_latency = histogram("riot_request_seconds", "Riot API request latency by endpoint, routing host and status")
+ratelimit_wait = histogram("riot_ratelimit_wait_seconds", "Time spent queued on the rate limiter by endpoint")
+storage_write = histogram("storage_write_seconds", "Duration of a TrackManager write to the database")
+embed_build = histogram("embed_build_seconds", "Time to build an embed or render a recap card by kind")
+interaction_latency = histogram("interaction_seconds", "Interaction creation to command completion by command")
+poll_checks = counter("poll_checks_total", "Scheduled player checks by result (new, none, error)")
+startup = histogram(
+    "startup_seconds",
+    "Process start to each startup milestone by phase",
+    (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+
+# ========== Functions ==========
+def _format_labels(key: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render_prometheus() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+
+        if isinstance(metric, Counter):
+            lines.append(f"# TYPE {metric.name} counter")
+            for key, value in metric.values.items():
+                lines.append(f"{metric.name}{_format_labels(key)} {value}")
+            continue
+
+        lines.append(f"# TYPE {metric.name} histogram")
+        for key, (counts, (total, count)) in metric.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*metric.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{metric.name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f"{metric.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{metric.name}_count{_format_labels(key)} {int(count)}")
+
+    return "\n".join(lines) + "\n"
+
+
+def render_summary() -> str:
+    """A short human-readable summary (counts, p50/p95 bucket bounds, averages) for /bot_stats."""
+    lines = []
+    for metric in _metrics:
+        if not metric.values:
+            continue
+        lines.append(metric.name)
+
+        for key, value in sorted(metric.values.items()):
+            labels = ", ".join(f"{v}" for _, v in key) or "-"
+            if isinstance(metric, Counter):
+                lines.append(f"  {labels}: {int(value)}")
+                continue
+
+            _, (total, count) = value
+            p50 = metric.quantile(0.5, key)
+            p95 = metric.quantile(0.95, key)
+            lines.append(
+                f"  {labels}: n={int(count)} avg={total / count * 1000:.1f}ms "
+                f"p50<={p50 * 1000:.0f}ms p95<={p95 * 1000:.0f}ms"
+            )
+
+    return "\n".join(lines) or "No metrics recorded yet."
+
+
+async def start_metrics_server(port: Optional[str] = METRICS_PORT):
+    """Serves `render_prometheus()` on http://0.0.0.0:<port>/metrics. Does nothing if no port is configured."""
+    if not port:
+        return None
+
+    from aiohttp import web
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=render_prometheus(), content_type="text/plain")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", int(port)).start()
+    print(f"Metrics available on :{port}/metrics")
+    return runner